@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Block-compressed at-rest copy of the poem log
+data/poems.blocks holds the log's records in blocks of BLOCK_RECORDS,
+each zlib-compressed on its own (stored column by column, dates as
+deltas, which compresses far better than the interleaved records),
+followed by a block index of (first date, offset, length). One poem or
+one page is read by decompressing only the block(s) that hold it. Full
+blocks never change, so an update only rewrites the last (partial)
+block onwards, plus the index and header.
+Run from scripts/ directory: python3 archive_blocks.py [page]
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+
+import poem_records
+
+BLOCKS_PATH = os.path.join(poem_records.DATA_DIR, 'poems.blocks')
+
+BLOCK_RECORDS = 1024
+
+# <magic, records per block, record count, index offset, log generation>
+HEADER = struct.Struct('<4sIQQQ')
+MAGIC = b'HKBL'
+
+# <first epoch_ms, offset, compressed length> per block
+INDEX_ENTRY = struct.Struct('<qQI')
+
+def pack_block(records):
+    """Compress a block of records, stored column by column"""
+    l1, l2, l3, dates = zip(*records)
+    deltas = array('q', [dates[0]] + [b - a for a, b in zip(dates, dates[1:])])
+    lines = array('H', l1 + l2 + l3)
+    if sys.byteorder == 'big':  # the file is little endian, like poems.bin
+        lines.byteswap()
+        deltas.byteswap()
+    raw = lines.tobytes() + deltas.tobytes()
+    return zlib.compress(raw, 9)
+
+def unpack_block(data, count):
+    """Decompress a block back into (l1, l2, l3, epoch_ms) records"""
+    raw = zlib.decompress(data)
+    lines = array('H')
+    lines.frombytes(raw[:6 * count])
+    deltas = array('q')
+    deltas.frombytes(raw[6 * count:])
+    if sys.byteorder == 'big':
+        lines.byteswap()
+        deltas.byteswap()
+
+    dates = []
+    date = 0
+    for delta in deltas:
+        date += delta
+        dates.append(date)
+    return list(zip(lines[:count], lines[count:2 * count], lines[2 * count:], dates))
+
+def _pack_blocks(records, offset, block_records):
+    """Compressed blocks of records starting at file offset, and their index entries"""
+    blocks = []
+    index = []
+    for start in range(0, len(records), block_records):
+        block = records[start:start + block_records]
+        data = pack_block(block)
+        index.append(INDEX_ENTRY.pack(block[0][3], offset, len(data)))
+        blocks.append(data)
+        offset += len(data)
+    return blocks, index, offset
+
+def write_blocks(records, path=BLOCKS_PATH, block_records=BLOCK_RECORDS, generation=0):
+    """Write records (oldest first) as a block-compressed file (atomically)"""
+    blocks, index, index_offset = _pack_blocks(records, HEADER.size, block_records)
+    header = HEADER.pack(MAGIC, block_records, len(records), index_offset, generation)
+    poem_records.write_atomic(path, header + b''.join(blocks) + b''.join(index))
+    return len(index)
+
+def update_blocks(records_path=poem_records.RECORDS_PATH, path=BLOCKS_PATH,
+                  block_records=BLOCK_RECORDS):
+    """Bring the block file up to date with the poem log.
+
+    Only the records from the last partial block on are read and packed;
+    the file is rebuilt if it is missing, damaged or from an earlier log
+    generation. Returns the number of blocks written.
+    """
+    generation = poem_records.log_generation(records_path)
+    total = poem_records.count_records(records_path)
+    try:
+        with BlockArchive(path) as archive:
+            current = (archive.block_records == block_records and archive.generation == generation
+                       and archive.count <= total)
+            count = archive.count
+            kept = count // block_records
+            spans = archive.spans[:kept + 1]
+            first_dates = archive.first_dates[:kept]
+            index_offset = archive.index_offset
+    except (FileNotFoundError, ValueError):
+        current = False
+    if not current:
+        return write_blocks(poem_records.read_records(records_path), path, block_records, generation)
+    if count == total:
+        return 0
+
+    start = kept * block_records
+    # The partial block (if any) is repacked in place; full blocks are kept
+    offset = spans[kept][0] if len(spans) > kept else index_offset
+    blocks, index, new_index_offset = _pack_blocks(
+        poem_records.read_range(start, total, records_path), offset, block_records)
+
+    kept_index = [INDEX_ENTRY.pack(date, *span) for date, span in zip(first_dates, spans)]
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        f.write(b''.join(blocks))
+        f.write(b''.join(kept_index + index))
+        f.truncate()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, block_records, total, new_index_offset, generation))
+    return len(blocks)
+
+class BlockArchive:
+    """Random access to a block file; only the index is read up front"""
+
+    def __init__(self, path=BLOCKS_PATH):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            magic, self.block_records, self.count, self.index_offset, self.generation = \
+                HEADER.unpack(self._file.read(HEADER.size))
+        except struct.error:
+            magic = None
+        if magic == MAGIC and self.block_records:
+            self._file.seek(self.index_offset)
+            raw = self._file.read()
+        # An update interrupted before its header was written leaves the
+        # index where the header does not expect it
+        if (magic != MAGIC or not self.block_records
+                or len(raw) != -(-self.count // self.block_records) * INDEX_ENTRY.size):
+            self._file.close()
+            raise ValueError(f"{path} is not a complete block-compressed poem archive")
+        index = list(INDEX_ENTRY.iter_unpack(raw))
+        self.first_dates = [entry[0] for entry in index]
+        self.spans = [entry[1:] for entry in index]
+        self._cached = (None, None)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def block(self, b):
+        """The records of block b (the last block read is kept)"""
+        if self._cached[0] != b:
+            offset, length = self.spans[b]
+            self._file.seek(offset)
+            count = min(self.block_records, self.count - b * self.block_records)
+            self._cached = (b, unpack_block(self._file.read(length), count))
+        return self._cached[1]
+
+    def record(self, i):
+        """Record i (oldest-first position), decompressing one block"""
+        if not 0 <= i < self.count:
+            raise IndexError(f"Record {i} out of range")
+        b, offset = divmod(i, self.block_records)
+        return self.block(b)[offset]
+
+    def records(self, start, stop):
+        """Records [start, stop), oldest first"""
+        start, stop = max(0, start), min(self.count, stop)
+        result = []
+        for b in range(start // self.block_records, (stop - 1) // self.block_records + 1):
+            base = b * self.block_records
+            result.extend(self.block(b)[max(0, start - base):stop - base])
+        return result
+
+    def page(self, number, size=10):
+        """Page `number` (1-based) of the newest-first listing"""
+        stop = self.count - (number - 1) * size
+        return self.records(stop - size, stop)[::-1] if stop > 0 else []
+
+    def since(self, epoch_ms):
+        """Records at or after epoch_ms, oldest first"""
+        b = max(0, bisect_right(self.first_dates, epoch_ms) - 1)
+        start = b * self.block_records
+        return [record for record in self.records(start, self.count) if record[3] >= epoch_ms]
+
+def main():
+    """Update data/poems.blocks and show one page read from it"""
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    blocks = update_blocks()
+    print(f"{blocks} blocks, {os.path.getsize(BLOCKS_PATH):,} bytes "
+          f"(log: {os.path.getsize(poem_records.RECORDS_PATH):,} bytes)")
+    with BlockArchive() as archive:
+        for record in archive.page(number):
+            print(poem_records.format_date(record[3]), record[:3])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Paged archive storage for the archive page
+Writes the poem log as fixed-size page files, data/pages/000123.json,
+numbered from the oldest poem so a full page never changes again, plus
+data/pages/manifest.json with the totals and each page's boundaries.
+Each run rewrites only the pages that gained poems since the last one.
+Run from scripts/ directory (use --rebuild to rewrite every page)
+"""
+
+import os
+import sys
+
+import poem_records
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'pages')
+MANIFEST_NAME = 'manifest.json'
+
+PAGE_SIZE = 100
+
+def page_name(page):
+    return f"{page:06d}.json"
+
+def page_path(page, pages_dir=PAGES_DIR):
+    return os.path.join(pages_dir, page_name(page))
+
+def manifest_path(pages_dir=PAGES_DIR):
+    return os.path.join(pages_dir, MANIFEST_NAME)
+
+def load_manifest(pages_dir=PAGES_DIR):
+    return poem_records.load_json(manifest_path(pages_dir))
+
+def update_pages(records_path=poem_records.RECORDS_PATH, pages_dir=PAGES_DIR,
+                 page_size=PAGE_SIZE, rebuild=False):
+    """Bring the page files up to date with the poem log.
+
+    Returns the list of page numbers that were (re)written.
+    """
+    generation = poem_records.log_generation(records_path)
+    total = poem_records.count_records(records_path)
+    manifest = load_manifest(pages_dir)
+
+    if (rebuild or manifest is None or manifest['page_size'] != page_size
+            or manifest.get('generation') != generation or manifest['total'] > total):
+        first_dirty = 0
+        boundaries = []
+    else:
+        first_dirty = manifest['total'] // page_size
+        boundaries = manifest['boundaries'][:first_dirty]
+
+    os.makedirs(pages_dir, exist_ok=True)
+    records = poem_records.read_range(first_dirty * page_size, total, records_path)
+
+    written = []
+    for offset in range(0, len(records), page_size):
+        page = first_dirty + offset // page_size
+        chunk = records[offset:offset + page_size]
+        # Each page lists its poems newest first, like poems.json
+        poems = [poem_records.record_to_poem(record) for record in reversed(chunk)]
+        poem_records.write_json(page_path(page, pages_dir), poems)
+        boundaries.append({
+            'page': page,
+            'count': len(chunk),
+            'first': poems[-1]['date'],
+            'last': poems[0]['date']
+        })
+        written.append(page)
+
+    poem_records.write_json(manifest_path(pages_dir), {
+        'page_size': page_size,
+        'total': total,
+        'generation': generation,
+        'pages': len(boundaries),
+        'newest_page': len(boundaries) - 1,
+        'boundaries': boundaries
+    })
+    return written
+
+def main():
+    """Update (or rebuild) data/pages"""
+    written = update_pages(rebuild='--rebuild' in sys.argv[1:])
+    manifest = load_manifest()
+    print(f"Wrote {len(written)} of {manifest['pages']} archive pages "
+          f"({manifest['total']} poems)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped reader for the poem log
+data/poems.bin is fixed-width and sorted by date, so a date range is found
+by bisecting the timestamp column of the mapped file and only the pages
+holding the answer are touched. Records are read zero-copy through a
+memoryview, or as a NumPy structured array over the map when available.
+Run from scripts/ directory: python3 archive_reader.py [days]
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from bisect import bisect_left
+
+import poem_records
+from poem_records import RECORD
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; plain struct access works too
+    np = None
+
+TIMESTAMP = struct.Struct('<q')
+TIMESTAMP_OFFSET = 6  # after the three uint16 line ids
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('l1', '<u2'), ('l2', '<u2'), ('l3', '<u2'), ('epoch_ms', '<i8')])
+
+class _Timestamps:
+    """Sequence view of the timestamp column, for bisect"""
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    def __len__(self):
+        return len(self.archive)
+
+    def __getitem__(self, i):
+        return self.archive.timestamp(i)
+
+class MappedArchive:
+    """A read-only, memory-mapped view of the poem log"""
+
+    def __init__(self, path=poem_records.RECORDS_PATH):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self.count = size // RECORD.size
+        if self.count:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.view = memoryview(self._map)[:self.count * RECORD.size]
+        else:
+            self._map = None
+            self.view = memoryview(b'')
+
+    def close(self):
+        self.view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def timestamp(self, i):
+        return TIMESTAMP.unpack_from(self.view, i * RECORD.size + TIMESTAMP_OFFSET)[0]
+
+    def record(self, i):
+        return RECORD.unpack_from(self.view, i * RECORD.size)
+
+    def bisect(self, epoch_ms):
+        """Index of the first record at or after epoch_ms"""
+        return bisect_left(_Timestamps(self), epoch_ms)
+
+    def records(self, start, stop):
+        """Records [start, stop), oldest first, unpacked from the mapped pages"""
+        return list(RECORD.iter_unpack(self.view[start * RECORD.size:stop * RECORD.size]))
+
+    def array(self, start=0, stop=None):
+        """Zero-copy NumPy structured array over records [start, stop)
+
+        Drop the array before closing the archive; it points into the map.
+        """
+        if np is None:
+            raise RuntimeError("NumPy is not installed")
+        stop = self.count if stop is None else stop
+        return np.frombuffer(self.view, dtype=RECORD_DTYPE, count=stop - start,
+                             offset=start * RECORD.size)
+
+    def between(self, start_ms, end_ms=None):
+        """Records with start_ms <= date < end_ms, oldest first"""
+        start = self.bisect(start_ms)
+        stop = self.count if end_ms is None else self.bisect(end_ms)
+        return self.records(start, stop)
+
+    def newest(self, count):
+        """The newest `count` records, newest first"""
+        return self.records(max(0, self.count - count), self.count)[::-1]
+
+def main():
+    """Show how many poems fall in the last N days"""
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    with MappedArchive() as archive:
+        now_ms = time.time_ns() // 1_000_000
+        start = archive.bisect(now_ms - days * poem_records.DAY_MS)
+        print(f"{len(archive)} poems, {len(archive) - start} in the last {days} days "
+              f"(from record {start})")
+
+if __name__ == "__main__":
+    main()
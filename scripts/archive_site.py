@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Static, crawlable archive pages
+Writes archive/page/N.html, numbered from the oldest poem like the
+data/pages files, so every page but the newest is final, plus
+archive/index.html linking them all. Each run reads and re-renders only
+the page(s) that gained poems (and the one before, for its "newer" link)
+and the index, whose date ranges come from the memory-mapped log.
+Templates are compiled once per process into literal/field parts.
+Run from scripts/ directory (use --rebuild to rewrite every page)
+"""
+
+import html
+import os
+import re
+import sys
+from datetime import timedelta
+
+import archive_pages
+import archive_reader
+import haiku_space
+import poem_records
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+SITE_DIR = os.path.join(ROOT, 'archive')
+STATE_PATH = os.path.join(ROOT, 'data', 'archive_site.json')
+
+PAGE_SIZE = archive_pages.PAGE_SIZE
+
+DATE_FORMAT = '%B %d, %Y, %I:%M %p'
+
+HEAD = '''<html>
+    <head>
+        <meta charset="utf-8">
+        <title>${title}</title>
+        <style>
+            body { font-family: sans-serif; max-width: 800px; margin: 0 auto; padding: 20px;
+                   line-height: 1.6; background: #d4cdc5; }
+            .poem { margin: 2em 0; padding: 1.5em; border: 1px solid #ddd; border-radius: 8px;
+                    background: white; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+            .date { color: #666; font-size: 0.9em; margin-top: 1em; border-top: 1px solid #eee;
+                    padding-top: 0.5em; }
+            pre { white-space: pre-wrap; font-family: inherit; margin: 0; font-size: 1.1em;
+                  line-height: 1.8; }
+            .nav { display: flex; align-items: center; gap: 1rem; flex-wrap: wrap; }
+            .nav a, .pages a { color: #0066cc; text-decoration: none; }
+            .pages li { margin: 0.3em 0; }
+        </style>
+    </head>
+    <body>
+        <div class="nav">
+            <h1>Haiku Archive</h1>
+            <a href="/">&#8962;</a>
+            <a href="/archive/index.html">All pages</a>
+            <a href="/rss.xml">RSS</a>
+        </div>
+'''
+
+PAGE_TEMPLATE = HEAD + '''        <p>${range} (times in UTC)</p>
+        <div class="nav">${links}</div>
+${poems}
+        <div class="nav">${links}</div>
+    </body>
+</html>
+'''
+
+POEM_TEMPLATE = '''        <div class="poem">
+            <pre>${content}</pre>
+            <div class="date">${date}</div>
+        </div>
+'''
+
+INDEX_TEMPLATE = HEAD + '''        <form id="search">
+            <input id="query" type="search" placeholder="Search the archive">
+            <button>Search</button>
+        </form>
+        <div id="results"></div>
+        <p>${total} poems on ${count} pages, newest first (times in UTC)</p>
+        <ul class="pages">
+${pages}
+        </ul>
+        <script>
+            // Word -> line -> poem id shards from data/search (see search_index.py);
+            // a poem id is its position in the oldest-first log, which locates
+            // its data/pages file
+            const WORD = /[a-z0-9]+(?:'[a-z]+)*/g;
+
+            function shardName(word) {
+                return (word.slice(0, 2).replace(/[^a-z0-9]/g, '_') + '__').slice(0, 2);
+            }
+
+            async function fetchJson(url) {
+                const response = await fetch(url);
+                return response.ok ? response.json() : null;
+            }
+
+            async function search(query) {
+                const words = query.toLowerCase().replace(/\u2019/g, "'").match(WORD) || [];
+                let ids = null;
+                for (const word of words) {
+                    const shard = await fetchJson('/data/search/' + shardName(word) + '.json') || {};
+                    const found = new Set();
+                    Object.values(shard[word] || {}).forEach(poems => poems.forEach(id => found.add(id)));
+                    ids = ids === null ? found : new Set([...ids].filter(id => found.has(id)));
+                }
+                return [...(ids || [])].sort((a, b) => b - a);
+            }
+
+            async function showResults(ids, pageSize) {
+                const results = document.getElementById('results');
+                results.textContent = ids.length + ' poems found';
+                const pages = {};
+                for (const id of ids.slice(0, 50)) {
+                    const page = Math.floor(id / pageSize);
+                    if (!(page in pages)) {
+                        pages[page] = await fetchJson('/data/pages/' + String(page).padStart(6, '0') + '.json') || [];
+                    }
+                    const poems = pages[page];  // newest first
+                    const poem = poems[poems.length - 1 - id % pageSize];
+                    if (!poem) continue;
+                    const div = document.createElement('div');
+                    div.className = 'poem';
+                    const pre = document.createElement('pre');
+                    pre.textContent = poem.content;
+                    const date = document.createElement('div');
+                    date.className = 'date';
+                    date.textContent = poem.date.replace('T', ' ').slice(0, 16);
+                    div.append(pre, date);
+                    results.appendChild(div);
+                }
+            }
+
+            document.getElementById('search').addEventListener('submit', async event => {
+                event.preventDefault();
+                const manifest = await fetchJson('/data/search/manifest.json');
+                if (!manifest) return;
+                showResults(await search(document.getElementById('query').value), manifest.page_size);
+            });
+        </script>
+    </body>
+</html>
+'''
+
+_FIELD = re.compile(r'\$\{(\w+)\}')
+
+_templates = {}
+
+def compile_template(text):
+    """Split a ${field} template into its parts once; returns render(**fields)"""
+    parts = _FIELD.split(text)
+    literals, names = parts[0::2], parts[1::2]
+    head, rest = literals[0], list(zip(names, literals[1:]))
+
+    def render(**fields):
+        out = [head]
+        for name, literal in rest:
+            out.append(fields[name])
+            out.append(literal)
+        return ''.join(out)
+
+    return render
+
+def template(text):
+    """The compiled form of a template, compiled on first use in this process"""
+    render = _templates.get(text)
+    if render is None:
+        render = _templates[text] = compile_template(text)
+    return render
+
+def page_path(page, site_dir=SITE_DIR):
+    return os.path.join(site_dir, 'page', f"{page}.html")
+
+def index_path(site_dir=SITE_DIR):
+    return os.path.join(site_dir, 'index.html')
+
+def _date(epoch_ms):
+    return (poem_records.EPOCH + timedelta(milliseconds=epoch_ms)).strftime(DATE_FORMAT)
+
+def _range(chunk):
+    return f"{_date(chunk[0][3])} to {_date(chunk[-1][3])}"
+
+def render_page(page, chunk, newest_page):
+    """One archive page; chunk is its records, oldest first"""
+    first, second, third = haiku_space.pools()
+    render_poem = template(POEM_TEMPLATE)
+    poems = ''.join(
+        render_poem(content=html.escape(f"{first[l1]}\n{second[l2]}\n{third[l3]}", quote=False),
+                    date=_date(epoch_ms))
+        for l1, l2, l3, epoch_ms in reversed(chunk))
+
+    links = []
+    if page < newest_page:
+        links.append(f'<a href="/archive/page/{page + 1}.html" rel="prev">&larr; Newer</a>')
+    if page > 0:
+        links.append(f'<a href="/archive/page/{page - 1}.html" rel="next">Older &rarr;</a>')
+
+    return template(PAGE_TEMPLATE)(
+        title=f"Serendipitous Oulipo Haiku Archive, page {page}",
+        range=_range(chunk), links=' '.join(links), poems=poems)
+
+def render_index(archive, page_size=PAGE_SIZE):
+    """The index of every page, newest first; archive is the MappedArchive
+    of the log, of which only each page's first and last dates are read
+    """
+    total = len(archive)
+    newest_page = (total - 1) // page_size
+    items = []
+    for page in range(newest_page, -1, -1):
+        first, stop = page * page_size, min(total, (page + 1) * page_size)
+        items.append(f'            <li><a href="/archive/page/{page}.html">Page {page}</a>: '
+                     f'{_date(archive.timestamp(first))} to {_date(archive.timestamp(stop - 1))} '
+                     f'({stop - first} poems)</li>')
+
+    return template(INDEX_TEMPLATE)(
+        title="Serendipitous Oulipo Haiku Archive, all pages",
+        total=str(total), count=str(newest_page + 1), pages='\n'.join(items))
+
+def load_state(path=STATE_PATH):
+    return poem_records.load_json(path)
+
+def update_site(records_path=poem_records.RECORDS_PATH, site_dir=SITE_DIR, page_size=PAGE_SIZE,
+                rebuild=False, state_path=STATE_PATH):
+    """Bring the static pages up to date with the poem log.
+
+    Returns the page numbers that were (re)written; the index always is.
+    """
+    if not poem_records.count_records(records_path):
+        return []
+    generation = poem_records.log_generation(records_path)
+    state = load_state(state_path)
+
+    with archive_reader.MappedArchive(records_path) as archive:
+        total = len(archive)
+        newest_page = (total - 1) // page_size
+        if (rebuild or state is None or state['page_size'] != page_size
+                or state.get('generation') != generation or state['total'] > total
+                or not os.path.exists(page_path(0, site_dir))):
+            first_dirty = 0
+        else:
+            # The previous newest page gained poems or needs its "newer" link
+            first_dirty = max(0, (state['total'] - 1) // page_size)
+
+        os.makedirs(os.path.join(site_dir, 'page'), exist_ok=True)
+        written = []
+        for page in range(first_dirty, newest_page + 1):
+            chunk = archive.records(page * page_size, min(total, (page + 1) * page_size))
+            poem_records.write_atomic(page_path(page, site_dir), render_page(page, chunk, newest_page))
+            written.append(page)
+
+        poem_records.write_atomic(index_path(site_dir), render_index(archive, page_size))
+
+    poem_records.write_json(state_path, {
+        'page_size': page_size,
+        'total': total,
+        'generation': generation
+    })
+    return written
+
+def main():
+    """Update (or rebuild) archive/page/*.html and archive/index.html"""
+    written = update_site(rebuild='--rebuild' in sys.argv[1:])
+    print(f"Wrote {len(written)} archive page(s) and the index "
+          f"({poem_records.count_records()} poems)")
+
+if __name__ == "__main__":
+    main()
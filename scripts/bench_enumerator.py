@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for haiku_enumerator
+Enumerates a slice of the id space (or all of it) at 1..N worker
+processes and reports combinations/second overall and per core.
+Run from scripts/ directory: python3 bench_enumerator.py [ids] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+import haiku_enumerator
+import haiku_space
+
+def count_repeats(chunk_start, batch):
+    """A cheap reduction so every chunk is really materialised and read"""
+    if haiku_enumerator.np is not None:
+        return int((batch.first == batch.third).sum())
+    return sum(1 for l1, _, l3 in batch if l1 == l3)
+
+def main():
+    ids = int(sys.argv[1]) if len(sys.argv) > 1 else haiku_space.space_size()
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    backend = 'numpy' if haiku_enumerator.np is not None else 'array'
+
+    print(f"Enumerating {ids:,} ids ({backend} backend, "
+          f"{haiku_enumerator.CHUNK_SIZE:,} per chunk)")
+
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        t = time.perf_counter()
+        results = haiku_enumerator.map_shards(count_repeats, workers, stop=ids)
+        elapsed = time.perf_counter() - t
+
+        repeats = sum(sum(shard) for shard in results)
+        rate = ids / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>2} workers: {elapsed:7.2f} s  {rate:>14,.0f} ids/s  "
+              f"{rate / workers:>14,.0f} ids/s/core  x{rate / baseline:.2f}  "
+              f"({repeats:,} with first == third)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: read-modify-write poems.json vs. appending to the poem log
+For archives of 25k, 250k and 1M synthetic poems, times the old
+save_to_poems_json() cycle (json.load, insert(0), json.dump indent=2)
+against one poem_records.append_records() call, plus the cost of
+materializing the newest-first views from the log. "publish" is what the
+archive stage then spends on that one new poem (page files, static pages,
+search shards, block file) with every store already built; "export json"
+is the full poems.json export that is now a weekly job.
+Run from scripts/ directory: python3 bench_poem_log.py [sizes...]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import archive_blocks
+import archive_pages
+import archive_site
+import haiku_space
+import poem_data
+import poem_records
+import search_index
+
+SIZES = (25_000, 250_000, 1_000_000)
+
+START_MS = 1_698_955_187_000  # the first archived poem, November 2023
+
+def synthetic_records(count):
+    rng = random.Random(count)
+    n1, n2, n3 = haiku_space.pool_sizes()
+    return [(rng.randrange(n1), rng.randrange(n2), rng.randrange(n3), START_MS + i * 600_000)
+            for i in range(count)]
+
+def old_save(poems_path, poem):
+    """The pre-log save_to_poems_json() cycle"""
+    with open(poems_path, 'r', encoding='utf-8') as f:
+        poems = json.load(f)
+    poems.insert(0, poem)
+    with open(poems_path, 'w', encoding='utf-8') as f:
+        json.dump(poems, f, indent=2)
+
+def publish(records_path, directory):
+    """The per-run writers of update_archive.publish_archive, on scratch stores"""
+    archive_pages.update_pages(records_path, os.path.join(directory, 'pages'))
+    archive_site.update_site(records_path, os.path.join(directory, 'site'),
+                             state_path=os.path.join(directory, 'site.json'))
+    search_index.update_index(records_path, os.path.join(directory, 'search'))
+    archive_blocks.update_blocks(records_path, os.path.join(directory, 'poems.blocks'))
+
+def timed(func, *args):
+    t = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - t
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+
+    print(f"{'poems':>10}  {'rewrite json':>13}  {'log append':>11}  "
+          f"{'newest 10':>10}  {'full view':>10}  {'publish':>10}  {'export json':>12}")
+    for size in sizes:
+        records = synthetic_records(size)
+        new_record = records[-1][:3] + (records[-1][3] + 600_000,)
+
+        with tempfile.TemporaryDirectory() as directory:
+            records_path = os.path.join(directory, 'poems.bin')
+            poems_path = os.path.join(directory, 'poems.json')
+            poem_records.write_records(records, records_path)
+            poem_records.export_json(records, poems_path)
+            publish(records_path, directory)
+
+            rewrite = timed(old_save, poems_path, poem_records.record_to_poem(new_record))
+            append = timed(poem_records.append_records, [new_record], records_path)
+            newest = timed(poem_data.first_page, 10, records_path)
+            view = timed(poem_data.load_poems, records_path)
+            published = timed(publish, records_path, directory)
+            export = timed(poem_records.export_json, records + [new_record], poems_path)
+
+        print(f"{size:>10,}  {rewrite * 1000:>10.1f} ms  {append * 1000:>8.3f} ms  "
+              f"{newest * 1000:>7.3f} ms  {view * 1000:>7.1f} ms  "
+              f"{published * 1000:>7.1f} ms  {export * 1000:>9.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Load test for haiku_server.py
+Opens keep-alive connections, fires GET requests at each endpoint and
+reports requests/second with p50/p99 latency. Starts its own server in a
+subprocess unless a port is given.
+Run from scripts/ directory: python3 bench_server.py [requests] [connections] [port]
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import haiku_space
+
+HOST = '127.0.0.1'
+
+async def client(port, paths, count, latencies):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        for _ in range(count):
+            path = paths()
+            t = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n".encode())
+            await writer.drain()
+
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t)
+    finally:
+        writer.close()
+
+async def run(port, label, paths, requests, connections):
+    latencies = []
+    per_client = requests // connections
+    t = time.perf_counter()
+    await asyncio.gather(*(client(port, paths, per_client, latencies)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - t
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{label:<16} {len(latencies) / elapsed:>9,.0f} req/s   "
+          f"p50 {p50:6.2f} ms   p99 {p99:6.2f} ms")
+
+async def wait_for_port(port):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection(HOST, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    port = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    server = None
+    if port is None:
+        port = 8000 + random.randrange(1000)
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(__file__), 'haiku_server.py'), str(port)],
+            stdout=subprocess.DEVNULL)
+
+    size = haiku_space.space_size()
+    endpoints = [
+        ('/haiku/random', lambda: '/haiku/random'),
+        ('/haiku/{id}', lambda: f"/haiku/{random.randrange(size)}"),
+        ('/haiku/current', lambda: '/haiku/current'),
+    ]
+
+    try:
+        asyncio.run(wait_for_port(port))
+        print(f"{requests:,} requests per endpoint over {connections} connections")
+        for label, paths in endpoints:
+            asyncio.run(run(port, label, paths, requests, connections))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
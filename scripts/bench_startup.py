@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: embedded line literals vs. the line catalog loader
+Writes the pools out as a module of list literals (the old layout of
+generate_haiku.py) and times importing it in a fresh interpreter against
+loading the same pools through line_catalog, with and without caches.
+Run from scripts/ directory: python3 bench_startup.py [runs]
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import line_catalog
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TIMER = '''
+import sys, time
+sys.path.insert(0, {path!r})
+t = time.perf_counter()
+{statement}
+print(time.perf_counter() - t)
+'''
+
+def write_literal_module(directory):
+    """Write the pools as a module of list literals, like the old generate_haiku.py"""
+    names = ('FIRST_LINES', 'SECOND_LINES', 'THIRD_LINES')
+    with open(os.path.join(directory, 'literal_lines.py'), 'w', encoding='utf-8') as f:
+        for name, lines in zip(names, line_catalog.load_lines()):
+            f.write(f"{name} = [\n")
+            for line in lines:
+                f.write(f"                {line!r},\n")
+            f.write("              ]\n\n")
+
+def time_import(path, statement, clear=None):
+    """Seconds taken by statement in a fresh interpreter"""
+    if clear and os.path.isdir(clear):
+        shutil.rmtree(clear)
+    result = subprocess.run(
+        [sys.executable, '-c', TIMER.format(path=path, statement=statement)],
+        capture_output=True, text=True, check=True
+    )
+    return float(result.stdout)
+
+def bench(label, runs, path, statement, clear=None):
+    times = [time_import(path, statement, clear) for _ in range(runs)]
+    print(f"{label:<44} median {statistics.median(times) * 1000:7.2f} ms"
+          f"   min {min(times) * 1000:7.2f} ms")
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_literal_module(directory)
+        literal_cache = os.path.join(directory, '__pycache__')
+        catalog_dir = os.path.join(directory, 'catalog_cache')
+        catalog_cache = os.path.join(catalog_dir, 'haiku_lines.marshal')
+        catalog = (f"import line_catalog; "
+                   f"line_catalog.load_lines(cache_path={catalog_cache!r})")
+
+        print(f"{runs} runs each, fresh interpreter per run")
+        bench("literal module, no .pyc (compile + exec)", runs,
+              directory, 'import literal_lines', clear=literal_cache)
+        time_import(directory, 'import literal_lines')
+        bench("literal module, cached .pyc", runs, directory, 'import literal_lines')
+        bench("line_catalog, no marshal cache (JSON)", runs,
+              SCRIPTS_DIR, catalog, clear=catalog_dir)
+        time_import(SCRIPTS_DIR, catalog)
+        bench("line_catalog, cached marshal", runs, SCRIPTS_DIR, catalog)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compact the poem archives into one canonical store
+Streams data/poems.bin, poems.json, poems_old.json and final_poems.json,
+drops duplicates on (line triple, timestamp) and writes a single
+date-sorted data/poems.bin. Inputs are cut into sorted runs of at most
+RUN_SIZE records that are spilled to disk and merged, so memory stays
+bounded no matter how large the inputs grow.
+Run from scripts/ directory: python3 compact_archives.py [--output PATH] [inputs...]
+"""
+
+import heapq
+import os
+import sys
+import tempfile
+from collections import Counter
+
+import poem_records
+import poem_stream
+import poem_writer
+from poem_records import RECORD
+
+DATA_DIR = poem_records.DATA_DIR
+
+DEFAULT_INPUTS = [
+    poem_records.RECORDS_PATH,
+    os.path.join(DATA_DIR, 'poems.json'),
+    os.path.join(DATA_DIR, 'poems_old.json'),
+    os.path.join(DATA_DIR, 'final_poems.json'),
+]
+
+RUN_SIZE = 100_000
+
+def sort_key(record):
+    return record[3], record[:3]
+
+class Report(Counter):
+    """Counts of what was read and dropped, plus a few examples"""
+
+    def __init__(self):
+        super().__init__()
+        self.examples = []
+
+    def add_example(self, name, poem, error):
+        if len(self.examples) < 10:
+            self.examples.append(f"{name} {poem.get('date')}: {error}")
+
+def iter_input(path, report):
+    """Yield records from a .bin log or a JSON archive, noting what is dropped"""
+    name = os.path.basename(path)
+    if path.endswith('.bin'):
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(RECORD.size * 4096)
+                if not chunk:
+                    break
+                for record in RECORD.iter_unpack(chunk[:len(chunk) - len(chunk) % RECORD.size]):
+                    report['read', name] += 1
+                    yield record
+        return
+
+    for poem in poem_stream.iter_poems(path):
+        report['read', name] += 1
+        try:
+            yield poem_records.poem_to_record(poem)
+        except (ValueError, KeyError) as e:
+            report['invalid', name] += 1
+            report.add_example(name, poem, e)
+
+def write_run(records, directory, n):
+    records.sort(key=sort_key)
+    path = os.path.join(directory, f"run{n:05d}.bin")
+    with open(path, 'wb') as f:
+        f.write(poem_records.pack_records(records))
+    return path
+
+def iter_run(path):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(RECORD.size * 4096)
+            if not chunk:
+                return
+            yield from RECORD.iter_unpack(chunk)
+
+def compact(inputs=DEFAULT_INPUTS, output=poem_records.RECORDS_PATH, run_size=RUN_SIZE):
+    """Merge inputs into output (atomically) and return a Report"""
+    report = Report()
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(output)) as directory:
+        runs = []
+        pending = []
+        for path in inputs:
+            if not os.path.exists(path):
+                report['missing', os.path.basename(path)] += 1
+                continue
+            for record in iter_input(path, report):
+                pending.append(record)
+                if len(pending) >= run_size:
+                    runs.append(write_run(pending, directory, len(runs)))
+                    pending = []
+        if pending:
+            runs.append(write_run(pending, directory, len(runs)))
+
+        tmp_path = os.path.join(directory, 'merged.bin')
+        previous = None
+        batch = []
+        with open(tmp_path, 'wb') as out:
+            for record in heapq.merge(*(iter_run(run) for run in runs), key=sort_key):
+                if record == previous:
+                    report['duplicates'] += 1
+                    continue
+                previous = record
+                batch.append(record)
+                report['written'] += 1
+                if len(batch) >= 4096:
+                    out.write(poem_records.pack_records(batch))
+                    batch = []
+            out.write(poem_records.pack_records(batch))
+        os.replace(tmp_path, output)
+    # Poems may have moved: stores keyed by log position must rebuild
+    poem_records.bump_generation(output)
+
+    return report
+
+def main():
+    """Compact the archives and report what was merged and dropped"""
+    args = sys.argv[1:]
+    output = poem_records.RECORDS_PATH
+    if '--output' in args:
+        i = args.index('--output')
+        output = args[i + 1]
+        del args[i:i + 2]
+    inputs = args or DEFAULT_INPUTS
+
+    # Hold the writer's commit lock so no producer appends mid-compaction
+    with poem_writer.file_lock(output + '.lock'):
+        report = compact(inputs, output)
+
+    for path in inputs:
+        name = os.path.basename(path)
+        if report['missing', name]:
+            print(f"{name:<20} missing")
+            continue
+        print(f"{name:<20} {report['read', name]:>7} read  {report['invalid', name]:>5} invalid")
+    for example in report.examples:
+        print(f"  dropped {example}")
+    print(f"{report['duplicates']:,} duplicates dropped, {report['written']:,} poems "
+          f"written to {output} ({os.path.getsize(output):,} bytes)")
+
+if __name__ == "__main__":
+    main()
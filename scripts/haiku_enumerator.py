@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Streaming enumerator for the whole haiku space
+Walks ids [start, stop) in fixed-size chunks of packed index triples
+(HaikuBatch), rendering text only when asked, and splits the id range
+into shards for a ProcessPoolExecutor.
+Run from scripts/ directory: python3 haiku_enumerator.py [start] [stop]
+"""
+
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import haiku_space
+from generate_haiku import HaikuBatch, np
+
+CHUNK_SIZE = 1 << 20
+
+def chunk_triples(start, stop):
+    """The index triples for ids [start, stop) as one HaikuBatch"""
+    n1, n2, n3 = haiku_space.pool_sizes()
+
+    if np is not None:
+        ids = np.arange(start, stop, dtype=np.int64)
+        rest, l3 = np.divmod(ids, n3)
+        l1, l2 = np.divmod(rest, n2)
+        return HaikuBatch(l1.astype(np.uint16), l2.astype(np.uint16), l3.astype(np.uint16))
+
+    first, second, third = array('H'), array('H'), array('H')
+    l1, rest = divmod(start, n2 * n3)
+    l2, l3 = divmod(rest, n3)
+    for _ in range(stop - start):
+        first.append(l1)
+        second.append(l2)
+        third.append(l3)
+        l3 += 1
+        if l3 == n3:
+            l3 = 0
+            l2 += 1
+            if l2 == n2:
+                l2 = 0
+                l1 += 1
+    return HaikuBatch(first, second, third)
+
+def iter_chunks(start=0, stop=None, chunk_size=CHUNK_SIZE):
+    """Yield (first_id, HaikuBatch) for consecutive chunks of [start, stop)"""
+    stop = haiku_space.space_size() if stop is None else stop
+    for chunk_start in range(start, stop, chunk_size):
+        yield chunk_start, chunk_triples(chunk_start, min(chunk_start + chunk_size, stop))
+
+def iter_texts(start=0, stop=None, chunk_size=CHUNK_SIZE):
+    """Yield (id, text) for every haiku in [start, stop), rendered lazily"""
+    for chunk_start, batch in iter_chunks(start, stop, chunk_size):
+        for offset, text in enumerate(batch.texts()):
+            yield chunk_start + offset, text
+
+def shard_ranges(shards, start=0, stop=None):
+    """Split [start, stop) into `shards` contiguous, nearly equal id ranges"""
+    stop = haiku_space.space_size() if stop is None else stop
+    size, extra = divmod(stop - start, shards)
+    ranges = []
+    lo = start
+    for i in range(shards):
+        hi = lo + size + (1 if i < extra else 0)
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges
+
+def _run_shard(func, lo, hi, chunk_size):
+    return [func(chunk_start, batch) for chunk_start, batch in iter_chunks(lo, hi, chunk_size)]
+
+def map_shards(func, workers, start=0, stop=None, chunk_size=CHUNK_SIZE, shards=None):
+    """Apply func(first_id, batch) to every chunk, sharded across processes.
+
+    func must be a module-level function so it can be pickled. Results
+    come back as one list per shard, in id order.
+    """
+    ranges = shard_ranges(shards or workers, start, stop)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_shard, func, lo, hi, chunk_size) for lo, hi in ranges]
+        return [future.result() for future in futures]
+
+def main():
+    """Print the haiku in an id range (default: the first three)"""
+    start = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    stop = int(sys.argv[2]) if len(sys.argv) > 2 else start + 3
+
+    for haiku_id, text in iter_texts(start, stop):
+        print(f"#{haiku_id}")
+        print(text)
+        print()
+
+if __name__ == "__main__":
+    main()
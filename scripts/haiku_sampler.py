@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Non-repeating sampler over the whole haiku space
+A keyed Feistel permutation shuffles the ids in [0, space_size()), and the
+sampler walks it with a counter, so every combination comes up exactly
+once per key. The only state is the key and the counter, kept in
+data/sampler_state.json next to poems.json.
+Run from scripts/ directory: python3 haiku_sampler.py [count]
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import haiku_space
+import poem_records
+
+STATE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'sampler_state.json')
+
+ROUNDS = 4
+
+class FeistelPermutation:
+    """A keyed bijection on [0, size) built from a balanced Feistel network.
+
+    The network permutes [0, 4**half_bits); ids that land outside the
+    domain are fed back in (cycle walking) until they fall inside it.
+    """
+
+    def __init__(self, key, size):
+        self.key = key
+        self.size = size
+        self.half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+        self.mask = (1 << self.half_bits) - 1
+
+    def _round(self, i, value):
+        digest = hashlib.blake2b(value.to_bytes(8, 'little'), digest_size=8,
+                                 key=self.key, salt=i.to_bytes(16, 'little')).digest()
+        return int.from_bytes(digest, 'little') & self.mask
+
+    def _encrypt(self, x):
+        left, right = x >> self.half_bits, x & self.mask
+        for i in range(ROUNDS):
+            left, right = right, left ^ self._round(i, right)
+        return (left << self.half_bits) | right
+
+    def __call__(self, x):
+        if not 0 <= x < self.size:
+            raise ValueError(f"Index out of range: {x}")
+        x = self._encrypt(x)
+        while x >= self.size:
+            x = self._encrypt(x)
+        return x
+
+class HaikuSampler:
+    """Hands out haiku ids in a fixed pseudo-random order without repeats"""
+
+    def __init__(self, key, counter=0, size=None):
+        self.key = key
+        self.counter = counter
+        self.size = size if size is not None else haiku_space.space_size()
+        self.permutation = FeistelPermutation(key, self.size)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        """Load the sampler state, or start a new random key if there is none"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return cls(os.urandom(16))
+
+        size = haiku_space.space_size()
+        if state['space_size'] != size:
+            raise ValueError(f"Sampler state is for {state['space_size']} combinations, "
+                             f"the pools now give {size}")
+        return cls(bytes.fromhex(state['key']), state['counter'], size)
+
+    def save(self, path=STATE_PATH):
+        """Persist the key and counter atomically"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        poem_records.write_json(path, {
+            'key': self.key.hex(),
+            'counter': self.counter,
+            'space_size': self.size
+        })
+
+    @property
+    def remaining(self):
+        return self.size - self.counter
+
+    def next_id(self):
+        """Return the next unused haiku id"""
+        if self.counter >= self.size:
+            raise StopIteration("Every combination has been sampled")
+        haiku_id = self.permutation(self.counter)
+        self.counter += 1
+        return haiku_id
+
+    def next_haiku(self):
+        """Return the next unused haiku in the same shape as generate_haiku()"""
+        haiku_id = self.next_id()
+        return {
+            'content': haiku_space.id_to_text(haiku_id),
+            'lines': haiku_space.unrank(haiku_id),
+            'date': poem_records.now_date()
+        }
+
+def generate_unique_haiku(path=STATE_PATH):
+    """Draw the next never-before-sampled haiku and persist the counter"""
+    sampler = HaikuSampler.load(path)
+    haiku = sampler.next_haiku()
+    sampler.save(path)
+    return haiku
+
+def main():
+    """Print the next few haiku without advancing the saved state"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sampler = HaikuSampler.load()
+
+    for _ in range(count):
+        print(sampler.next_haiku()['content'])
+        print()
+    print(f"{sampler.counter:,} of {sampler.size:,} combinations used")
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
 """
 Scheduled haiku updater - replaces cron
-Runs continuously and updates haikus every hour
+Runs continuously and publishes a haiku every 6 hours (00, 06, 12 and 18
+UTC). It sleeps until the exact next slot instead of polling, and after
+downtime publishes every missed slot in one batch: one persist, one
+render and one commit. Queue state is kept in data/scheduler_state.json.
 """
 
-import time
-import schedule
+import asyncio
 import subprocess
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timezone
+
+import pipeline
+import poem_records
+
+SLOT_SECONDS = 6 * 60 * 60
+
+# Missed slots older than this many are dropped rather than backfilled
+MAX_BACKLOG = 28
+
+STATE_PATH = os.path.join(poem_records.DATA_DIR, 'scheduler_state.json')
 
 def run_command(cmd, cwd=None):
     """Run a command and return success status and output"""
@@ -26,8 +38,11 @@ def run_command(cmd, cwd=None):
     except Exception as e:
         return False, "", str(e)
 
-def update_haiku():
-    """Main haiku update function - runs every hour"""
+def update_haiku(slots=None):
+    """Main haiku update function - one haiku per slot (or one for now)
+
+    Returns True once the poems are generated and committed locally.
+    """
     print(f"\n{'='*50}")
     print(f"Starting haiku update at {datetime.now()}")
     print(f"{'='*50}")
@@ -37,29 +52,16 @@ def update_haiku():
         script_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(script_dir)
 
-        # Step 1: Generate new haiku
-        print("Generating new haiku...")
-        success, stdout, stderr = run_command("python3 generate_haiku.py", cwd=script_dir)
-        if not success:
-            print(f"ERROR: Failed to generate haiku: {stderr}")
-            return
-        print("✓ Haiku generated")
-
-        # Step 2: Update archive
-        print("Updating archive...")
-        success, stdout, stderr = run_command("python3 update_archive.py", cwd=script_dir)
-        if not success:
-            print(f"ERROR: Failed to update archive: {stderr}")
-            return
-        print("✓ Archive updated")
-
-        # Step 3: Update RSS
-        print("Updating RSS feed...")
-        success, stdout, stderr = run_command("python3 update_rss.py", cwd=script_dir)
-        if not success:
-            print(f"ERROR: Failed to update RSS: {stderr}")
-            return
-        print("✓ RSS updated")
+        # Steps 1-3: generate, archive and RSS in this process, sharing
+        # one read of the poem log (see pipeline.py)
+        print("Generating new haiku, archive and RSS feed...")
+        try:
+            state = pipeline.run(slots=slots)
+        except pipeline.StageError as e:
+            print(f"ERROR: {e}")
+            return False
+        print(f"✓ {len(state.haikus)} haiku generated, archive and RSS updated "
+              f"({pipeline.format_timings(state.timings)})")
 
         # Step 4: Git operations from project root
         os.chdir(project_root)
@@ -69,18 +71,20 @@ def update_haiku():
         success, stdout, stderr = run_command("git add .")
         if not success:
             print(f"ERROR: Failed to add files: {stderr}")
-            return
+            return False
 
         # Commit
         commit_msg = f"Update haiku {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        if len(state.haikus) > 1:
+            commit_msg += f" ({len(state.haikus)} poems, catching up)"
         print(f"Committing: {commit_msg}")
         success, stdout, stderr = run_command(f'git commit -m "{commit_msg}"')
         if not success:
             if "nothing to commit" in stderr:
                 print("No changes to commit")
-                return
+                return True
             print(f"ERROR: Failed to commit: {stderr}")
-            return
+            return False
 
         # Push
         print("Pushing to remote...")
@@ -92,29 +96,99 @@ def update_haiku():
             print("Commits are saved locally, will retry next time")
 
         print(f"Update completed at {datetime.now()}")
+        return True
 
     except Exception as e:
         print(f"Update failed with exception: {e}")
+        return False
+
+def slot_start(slot):
+    return datetime.fromtimestamp(slot * SLOT_SECONDS, timezone.utc)
+
+def slot_of(when):
+    return int(when.timestamp()) // SLOT_SECONDS
+
+class CatchUpScheduler:
+    """Publishes one haiku per slot, backfilling slots missed while down"""
+
+    def __init__(self, records_path=poem_records.RECORDS_PATH, update=update_haiku,
+                 state_path=STATE_PATH):
+        self.records_path = records_path
+        self.update = update
+        self.state_path = state_path
+        self.queue = []
+        self.dropped = 0
+        self.running = False
+        self.next_deadline = None
+        self.last_run = None
+
+    def last_published_slot(self):
+        """Slot of the newest poem in the log (None for an empty log)"""
+        tail = poem_records.read_tail(1, self.records_path)
+        return tail[-1][3] // 1000 // SLOT_SECONDS if tail else None
+
+    def missed_slots(self, now):
+        """Slots from the one after the newest poem up to the current one"""
+        current = slot_of(now)
+        last = self.last_published_slot()
+        first = current if last is None else last + 1
+        first_kept = max(first, current - MAX_BACKLOG + 1)
+        return [slot_start(slot) for slot in range(first_kept, current + 1)], first_kept - first
+
+    def status(self):
+        """The queue state, as written to data/scheduler_state.json"""
+        return {
+            'queue': [slot.isoformat() for slot in self.queue],
+            'dropped': self.dropped,
+            'running': self.running,
+            'next_deadline': self.next_deadline.isoformat() if self.next_deadline else None,
+            'last_run': self.last_run
+        }
+
+    def save_status(self):
+        poem_records.write_json(self.state_path, self.status())
+
+    async def run_due(self):
+        """Publish every slot that is due, as one batch"""
+        self.queue, self.dropped = self.missed_slots(datetime.now(timezone.utc))
+        if not self.queue:
+            return
+        if self.dropped:
+            print(f"Skipping {self.dropped} slot(s) older than {MAX_BACKLOG} slots")
+        if len(self.queue) > 1:
+            print(f"Catching up on {len(self.queue)} missed slot(s) in one batch")
+
+        self.running = True
+        self.save_status()
+        started = datetime.now(timezone.utc)
+        # The pipeline and git are blocking; keep the event loop free
+        ok = await asyncio.to_thread(self.update, list(self.queue))
+        self.running = False
+        self.last_run = {'at': started.isoformat(), 'slots': len(self.queue), 'ok': bool(ok)}
+        if ok:
+            self.queue = []
+
+    async def run_forever(self):
+        while True:
+            await self.run_due()
+
+            # Sleep until the exact start of the next slot; a late wake-up
+            # (suspend, a slow batch) just shows up as missed slots
+            now = datetime.now(timezone.utc)
+            self.next_deadline = slot_start(slot_of(now) + 1)
+            self.save_status()
+            await asyncio.sleep((self.next_deadline - now).total_seconds())
 
 def main():
     print("Starting Haiku Scheduler...")
     print(f"Current time: {datetime.now()}")
-    print("Will update every 6 hours")
-
-    # Schedule the job every hour
-    schedule.every(6).hours.do(update_haiku)
-
-    # Optional: run immediately for testing
-    # update_haiku()
-
+    print(f"Will publish every {SLOT_SECONDS // 3600} hours, catching up on missed slots")
     print("Scheduler running... Press Ctrl+C to stop")
 
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        asyncio.run(CatchUpScheduler().run_forever())
     except KeyboardInterrupt:
         print("\nScheduler stopped by user")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+On-demand haiku HTTP service (asyncio, stdlib only)
+  GET /haiku/random   a fresh generate_haiku()
+  GET /haiku/{id}     the haiku with that id (see haiku_space.py)
+  GET /haiku/current  the newest poem in the archive
+The line pools are preloaded as JSON-escaped byte fragments, so a response
+is a few byte joins; the archive tip is re-read only when poems.bin changes.
+Run from scripts/ directory: python3 haiku_server.py [port] [host]
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import haiku_space
+import poem_records
+from generate_haiku import generate_haiku
+
+DEFAULT_PORT = 8418
+REFRESH_SECONDS = 30
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+class HaikuService:
+    """Preloaded pools and archive tip, rendered straight to JSON bytes"""
+
+    def __init__(self, records_path=poem_records.RECORDS_PATH):
+        self.records_path = records_path
+        self.sizes = haiku_space.pool_sizes()
+        self.size = haiku_space.space_size()
+        # json.dumps('line')[1:-1]: each line escaped once, ready to splice
+        self.fragments = [
+            [json.dumps(line)[1:-1].encode('utf-8') for line in lines]
+            for lines in haiku_space.pools()
+        ]
+        self.current = None
+        self._stamp = None
+        self.refresh()
+
+    def refresh(self):
+        """Reload the newest archived poem if poems.bin has changed"""
+        try:
+            stat = os.stat(self.records_path)
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            tail = poem_records.read_tail(1, self.records_path)
+            if tail:
+                l1, l2, l3, epoch_ms = tail[-1]
+                self.current = self.render(l1, l2, l3, poem_records.format_date(epoch_ms))
+            self._stamp = stamp
+
+    def render(self, l1, l2, l3, date=None):
+        """The JSON body for one haiku"""
+        first, second, third = self.fragments
+        body = b''.join((
+            b'{"id": ', str(haiku_space.rank(l1, l2, l3)).encode(),
+            b', "content": "', first[l1], b'\\n', second[l2], b'\\n', third[l3],
+            b'", "lines": [', f"{l1}, {l2}, {l3}".encode(), b']',
+        ))
+        if date:
+            body += b', "date": "' + date.encode() + b'"'
+        return body + b'}'
+
+    def handle(self, path):
+        """Map a request path to (status, body)"""
+        if path == '/haiku/random':
+            haiku = generate_haiku()
+            return 200, self.render(*haiku['lines'], haiku['date'])
+        if path == '/haiku/current':
+            if self.current is None:
+                return 404, b'{"error": "archive is empty"}'
+            return 200, self.current
+        if path.startswith('/haiku/'):
+            key = path[len('/haiku/'):]
+            # isdigit() alone also accepts digits such as '²' that int() rejects
+            if not (key.isascii() and key.isdigit()) or int(key) >= self.size:
+                return 404, b'{"error": "no such haiku"}'
+            return 200, self.render(*haiku_space.unrank(int(key)))
+        return 404, b'{"error": "not found"}'
+
+def response(status, body, keep_alive):
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Access-Control-Allow-Origin: *\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+async def serve_connection(service, reader, writer):
+    """Handle HTTP/1.1 requests on one connection until it closes"""
+    try:
+        while True:
+            keep_alive = True
+            try:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'connection' and value.strip().lower() == 'close':
+                        keep_alive = False
+            except ValueError:  # a request or header line over the stream limit
+                request_line = b''
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                status, body, keep_alive = 400, b'{"error": "bad request"}', False
+            elif parts[0] != 'GET':
+                status, body = 405, b'{"error": "GET only"}'
+            else:
+                status, body = service.handle(parts[1].split('?', 1)[0])
+
+            writer.write(response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def refresh_loop(service):
+    while True:
+        await asyncio.sleep(REFRESH_SECONDS)
+        service.refresh()
+
+async def run_server(host='127.0.0.1', port=DEFAULT_PORT, service=None):
+    """Start the service and serve until cancelled"""
+    service = service or HaikuService()
+    server = await asyncio.start_server(
+        lambda reader, writer: serve_connection(service, reader, writer), host, port)
+    refresher = asyncio.create_task(refresh_loop(service))
+
+    print(f"Serving haiku on http://{host}:{port}/haiku/random", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        refresher.cancel()
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    host = sys.argv[2] if len(sys.argv) > 2 else '127.0.0.1'
+    try:
+        asyncio.run(run_server(host, port))
+    except KeyboardInterrupt:
+        print("\nServer stopped by user")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Integer addressing for the |L1| x |L2| x |L3| haiku space
+Every combination has one id in [0, space_size()), ordered by first line,
+then second, then third, so permalinks, dedup and analytics can use ints.
+Run from scripts/ directory: python3 haiku_space.py [id | "poem text"]
+"""
+
+import sys
+
+import line_catalog
+
+# Archived spellings of lines that have since been corrected in the pools
+LINE_ALIASES = (
+    {'why isn’t solstace': 'why isn’t solstice'},
+    {},
+    {},
+)
+
+_line_index = None
+
+def pools():
+    """The three line pools from the line catalog"""
+    return line_catalog.load_lines()
+
+def pool_sizes():
+    """Number of lines at each position"""
+    return tuple(len(lines) for lines in pools())
+
+def space_size():
+    """Total number of combinations"""
+    n1, n2, n3 = pool_sizes()
+    return n1 * n2 * n3
+
+def rank(l1, l2, l3):
+    """Map a line triple to its id"""
+    n1, n2, n3 = pool_sizes()
+    if not (0 <= l1 < n1 and 0 <= l2 < n2 and 0 <= l3 < n3):
+        raise ValueError(f"Line triple out of range: {(l1, l2, l3)}")
+    return (l1 * n2 + l2) * n3 + l3
+
+def unrank(haiku_id):
+    """Map an id back to its line triple"""
+    n1, n2, n3 = pool_sizes()
+    if not 0 <= haiku_id < n1 * n2 * n3:
+        raise ValueError(f"Haiku id out of range: {haiku_id}")
+    rest, l3 = divmod(haiku_id, n3)
+    l1, l2 = divmod(rest, n2)
+    return l1, l2, l3
+
+def line_index():
+    """Reverse index: one {line text: index} dict per position.
+
+    Lines that appear twice in a pool resolve to their first index.
+    """
+    global _line_index
+    if _line_index is None:
+        index = []
+        for position, lines in enumerate(pools()):
+            lookup = {}
+            for i, line in enumerate(lines):
+                lookup.setdefault(line, i)
+            for old, new in LINE_ALIASES[position].items():
+                lookup.setdefault(old, lookup[new])
+            index.append(lookup)
+        _line_index = index
+    return _line_index
+
+def text_to_triple(content):
+    """Map a full three-line poem text to its line triple"""
+    lines = content.split('\n')
+    if len(lines) != 3:
+        raise ValueError(f"Not a three-line poem: {content!r}")
+
+    index = line_index()
+    try:
+        return tuple(index[i][line] for i, line in enumerate(lines))
+    except KeyError as e:
+        raise ValueError(f"Line not in pools: {e.args[0]!r}") from None
+
+def text_to_id(content):
+    """Map a full three-line poem text to its id"""
+    return rank(*text_to_triple(content))
+
+def id_to_text(haiku_id):
+    """Render the haiku with the given id"""
+    first, second, third = pools()
+    l1, l2, l3 = unrank(haiku_id)
+    return f"{first[l1]}\n{second[l2]}\n{third[l3]}"
+
+def main():
+    """Look up a haiku by id, or the id of a poem given as text"""
+    if len(sys.argv) < 2:
+        print(f"{space_size():,} combinations ({' x '.join(map(str, pool_sizes()))})")
+        return
+
+    arg = sys.argv[1]
+    if arg.isdigit():
+        print(id_to_text(int(arg)))
+    else:
+        print(text_to_id(arg.replace('\\n', '\n')))
+
+if __name__ == "__main__":
+    main()
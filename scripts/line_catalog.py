@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Line catalog loader
+data/haiku_lines.json is the one canonical copy of the three line pools.
+The parsed pools are cached in marshal form under scripts/__pycache__
+together with a hash of the JSON bytes; like a .pyc, the cache is trusted
+while the catalog's mtime and size match and re-validated by content hash
+otherwise, so an hourly run never re-parses an unchanged catalog.
+Run from scripts/ directory to (re)build the cache and print the pool sizes
+"""
+
+import marshal
+import os
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'haiku_lines.json')
+CACHE_PATH = os.path.join(os.path.dirname(__file__), '__pycache__', 'haiku_lines.marshal')
+
+POSITIONS = ('first_lines', 'second_lines', 'third_lines')
+
+_cache = {}
+
+def _digest(raw):
+    import hashlib  # only needed when the cache has to be re-validated
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def _parse(raw):
+    import json  # only needed on a cache miss
+    catalog = json.loads(raw)
+    return tuple(list(catalog[position]) for position in POSITIONS)
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+def _write_cache(cache_path, entry):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(entry, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # read-only checkout: just parse each time
+
+def load_lines(path=CATALOG_PATH, cache_path=CACHE_PATH):
+    """Return the (first, second, third) line lists from the catalog"""
+    if path in _cache:
+        return _cache[path]
+
+    stat = os.stat(path)
+    entry = _read_cache(cache_path)
+    if entry and (entry['mtime_ns'], entry['size']) == (stat.st_mtime_ns, stat.st_size):
+        pools = entry['pools']
+    else:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = _digest(raw)
+        if entry and entry['digest'] == digest:
+            pools = entry['pools']
+        else:
+            pools = _parse(raw)
+        _write_cache(cache_path, {
+            'digest': digest,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'pools': pools
+        })
+
+    pools = tuple(pools)
+    _cache[path] = pools
+    return pools
+
+def main():
+    """Build the cache and report what was loaded"""
+    first, second, third = load_lines()
+    print(f"Loaded {len(first)} x {len(second)} x {len(third)} lines from {CATALOG_PATH}")
+
+if __name__ == "__main__":
+    main()
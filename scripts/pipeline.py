@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+In-process haiku pipeline
+Runs generate -> persist -> archive -> RSS in one interpreter, sharing a
+PipelineState between the stages, and records each stage's wall time.
+No stage reads the whole poem log: each touches only its tail (the
+newest page, the poems since the feed's newest item, what the derived
+stores have not seen yet). The scripts the stages come from still run
+standalone.
+Run from scripts/ directory: python3 pipeline.py
+"""
+
+import os
+import time
+
+import generate_haiku
+import poem_data
+import poem_records
+import published_set
+import update_archive
+import update_rss
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class StageError(Exception):
+    """A pipeline stage failed; the stage name is kept for reporting"""
+
+    def __init__(self, stage, error):
+        super().__init__(f"{stage} stage failed: {error}")
+        self.stage = stage
+
+class PipelineState:
+    """What the stages share: the poem log's path and the new haiku.
+
+    slots, when given, are the aware datetimes to publish one haiku for
+    each (a scheduler's backlog); otherwise one haiku is made for now.
+    """
+
+    def __init__(self, records_path=poem_records.RECORDS_PATH, slots=None):
+        self.records_path = records_path
+        self.slots = slots
+        self.haikus = []
+        self.haiku = None
+        self.timings = []
+
+def generate(state):
+    with published_set.load(records_path=state.records_path) as published:
+        if state.slots:
+            for slot in sorted(state.slots):
+                haiku = generate_haiku.generate_haiku(published)
+                haiku['date'] = poem_records.format_date(int(slot.timestamp() * 1000))
+                state.haikus.append(haiku)
+        else:
+            state.haikus.append(generate_haiku.generate_haiku(published))
+    state.haiku = state.haikus[-1]
+    generate_haiku.save_current_haiku(state.haiku, os.path.join(SCRIPT_DIR, 'current_haiku.txt'))
+    print(state.haiku['content'])
+
+def persist(state):
+    # The whole batch goes to the log in one commit
+    generate_haiku.save_batch_to_archive(state.haikus, state.records_path)
+
+def archive(state):
+    poems, total = poem_data.first_page(10, state.records_path)
+    update_archive.publish_archive(poems, total, state.records_path)
+
+def rss(state):
+    # Only poems newer than the feed's newest item are rendered
+    items, rendered = update_rss.update_feed(
+        lambda epoch_ms: poem_data.poems_since(epoch_ms, state.records_path),
+        records_path=state.records_path)
+    print(f"Updated rss.xml: {rendered} new item(s), {items} in the feed")
+
+STAGES = [
+    ('generate', generate),
+    ('persist', persist),
+    ('archive', archive),
+    ('rss', rss),
+]
+
+def run(stages=STAGES, records_path=poem_records.RECORDS_PATH, slots=None):
+    """Run the stages in order on one shared state and return it"""
+    state = PipelineState(records_path, slots)
+    for name, stage in stages:
+        t = time.perf_counter()
+        try:
+            stage(state)
+        except Exception as e:
+            raise StageError(name, e) from e
+        state.timings.append((name, time.perf_counter() - t))
+    return state
+
+def format_timings(timings):
+    return ', '.join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings)
+
+def main():
+    """Run the whole pipeline once and report each stage's wall time"""
+    state = run()
+    print(f"Stages: {format_timings(state.timings)}")
+    print(f"Total: {sum(seconds for _, seconds in state.timings) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Shared data access for the poem archive
+Every script reads poems through this module. A PoemRecord is just the
+line ids plus epoch milliseconds (parsed once, when loaded from JSON), in
+__slots__; its text is only rendered when first asked for. The loaders
+pick the source: the SQLite store when POEM_STORE=sqlite, else
+data/poems.bin, else data/poems.json.
+Run from scripts/ directory: python3 poem_data.py [days]
+"""
+
+import os
+import sys
+import time
+from datetime import timedelta
+
+import archive_reader
+import haiku_space
+import poem_records
+import poem_store_sqlite
+import poem_stream
+
+class PoemRecord:
+    """One archived poem: (l1, l2, l3) line ids and a UTC epoch_ms"""
+
+    __slots__ = ('l1', 'l2', 'l3', 'epoch_ms', '_content')
+
+    def __init__(self, l1, l2, l3, epoch_ms, content=None):
+        self.l1 = l1
+        self.l2 = l2
+        self.l3 = l3
+        self.epoch_ms = epoch_ms
+        self._content = content
+
+    @classmethod
+    def from_record(cls, record):
+        """From a poem_records (l1, l2, l3, epoch_ms) tuple"""
+        return cls(*record)
+
+    @classmethod
+    def from_poem(cls, poem):
+        """From a {'content', 'date'} dict; lines no longer in the pools keep
+        their text and have no ids
+        """
+        try:
+            l1, l2, l3 = haiku_space.text_to_triple(poem['content'])
+        except ValueError:
+            l1 = l2 = l3 = None
+        return cls(l1, l2, l3, poem_records.parse_date(poem['date']), poem['content'])
+
+    @property
+    def lines(self):
+        return self.l1, self.l2, self.l3
+
+    @property
+    def record(self):
+        return self.l1, self.l2, self.l3, self.epoch_ms
+
+    @property
+    def content(self):
+        if self._content is None:
+            first, second, third = haiku_space.pools()
+            self._content = f"{first[self.l1]}\n{second[self.l2]}\n{third[self.l3]}"
+        return self._content
+
+    @property
+    def date(self):
+        """The archive's ISO date string ('...Z')"""
+        return poem_records.format_date(self.epoch_ms)
+
+    @property
+    def when(self):
+        """The date as an aware UTC datetime"""
+        return poem_records.EPOCH + timedelta(milliseconds=self.epoch_ms)
+
+    def as_dict(self):
+        """The {'content', 'date'} shape of poems.json"""
+        return {'content': self.content, 'date': self.date}
+
+    def __repr__(self):
+        return f"PoemRecord({self.l1}, {self.l2}, {self.l3}, {self.epoch_ms})"
+
+def _from_records(records):
+    return [PoemRecord(*record) for record in records]
+
+def poems_from_records(records):
+    """PoemRecords, newest first, from oldest-first poem log records"""
+    return _from_records(reversed(records))
+
+def _use_sqlite():
+    return os.environ.get('POEM_STORE') == 'sqlite'
+
+def load_poems(records_path=poem_records.RECORDS_PATH, poems_path=poem_records.POEMS_JSON_PATH):
+    """Every poem, newest first"""
+    if _use_sqlite():
+        with poem_store_sqlite.PoemStore() as store:
+            store.sync_from_log(records_path)
+            return _from_records(store.since(0))
+    if os.path.exists(records_path):
+        return poems_from_records(poem_records.read_records(records_path))
+    try:
+        return [PoemRecord.from_poem(poem) for poem in poem_stream.iter_poems(poems_path)]
+    except FileNotFoundError:
+        return []
+
+def recent_poems(days=30, now_ms=None, records_path=poem_records.RECORDS_PATH,
+                 poems_path=poem_records.POEMS_JSON_PATH):
+    """Poems from the last `days` days, newest first (only those are read)"""
+    now_ms = now_ms if now_ms is not None else time.time_ns() // 1_000_000
+    return poems_since(now_ms - days * poem_records.DAY_MS, records_path, poems_path)
+
+def poems_since(cutoff, records_path=poem_records.RECORDS_PATH,
+                poems_path=poem_records.POEMS_JSON_PATH):
+    """Poems at or after epoch milliseconds cutoff, newest first"""
+    if _use_sqlite():
+        # Indexed query on the date
+        with poem_store_sqlite.PoemStore() as store:
+            store.sync_from_log(records_path)
+            return _from_records(store.since(cutoff))
+
+    if os.path.exists(records_path):
+        # Bisect the date-sorted log instead of reading the whole archive
+        with archive_reader.MappedArchive(records_path) as archive:
+            return poems_from_records(archive.between(cutoff))
+
+    # poems.json is newest first: stop reading at the cutoff
+    cutoff_date = poem_records.EPOCH + timedelta(milliseconds=cutoff)
+    try:
+        return [PoemRecord.from_poem(poem) for poem in poem_stream.iter_since(cutoff_date, poems_path)]
+    except FileNotFoundError:
+        return []
+
+def first_page(limit=10, records_path=poem_records.RECORDS_PATH,
+               poems_path=poem_records.POEMS_JSON_PATH):
+    """The newest `limit` poems and the total number of poems"""
+    if _use_sqlite():
+        with poem_store_sqlite.PoemStore() as store:
+            store.sync_from_log(records_path)
+            return _from_records(store.page(1, limit)), store.count()
+
+    if os.path.exists(records_path):
+        # Only the log's tail is read
+        with archive_reader.MappedArchive(records_path) as archive:
+            return _from_records(archive.newest(limit)), len(archive)
+
+    # Stream the first poems; the total comes from the count sidecar
+    try:
+        poems = [PoemRecord.from_poem(poem) for poem in poem_stream.newest(limit, poems_path)]
+        return poems, poem_stream.count_poems(poems_path)
+    except FileNotFoundError:
+        return [], 0
+
+def main():
+    """Show the poems of the last N days from whichever source is in use"""
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    poems = recent_poems(days)
+    print(f"{len(poems)} poems in the last {days} days")
+    for poem in poems[:3]:
+        print(poem.date)
+        print(poem.content)
+        print()
+
+if __name__ == "__main__":
+    main()
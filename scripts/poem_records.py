@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Compact fixed-width storage for the poem archive
+Every poem is just its line triple plus a UTC timestamp, so each one is
+stored as 3 x uint16 line indices + int64 epoch milliseconds (14 bytes).
+Records are kept oldest first so new poems are a plain append; poems.json
+is a derived, newest-first export of this file.
+Run from scripts/ directory to convert data/poems.json into data/poems.bin
+"""
+
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import haiku_space
+import poem_stream
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+RECORDS_PATH = os.path.join(DATA_DIR, 'poems.bin')
+POEMS_JSON_PATH = os.path.join(DATA_DIR, 'poems.json')
+
+# <l1, l2, l3, epoch milliseconds>, little endian, no padding
+RECORD = struct.Struct('<3Hq')
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+def parse_date(date):
+    """Convert an archive date string ('...Z') to epoch milliseconds"""
+    dt = datetime.fromisoformat(date.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - EPOCH) // timedelta(milliseconds=1)
+
+def format_date(epoch_ms):
+    """Convert epoch milliseconds back to the archive's ISO date format"""
+    dt = EPOCH + timedelta(milliseconds=epoch_ms)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{epoch_ms % 1000:03d}Z"
+
+def now_date():
+    """The current time (UTC) in the archive's ISO date format"""
+    return format_date(time.time_ns() // 1_000_000)
+
+def poem_to_record(poem):
+    """Convert a {'content', 'date'} poem into an (l1, l2, l3, epoch_ms) record"""
+    return haiku_space.text_to_triple(poem['content']) + (parse_date(poem['date']),)
+
+def record_to_poem(record):
+    """Convert an (l1, l2, l3, epoch_ms) record back into a poem dict"""
+    first, second, third = haiku_space.pools()
+    l1, l2, l3, epoch_ms = record
+    return {
+        'content': f"{first[l1]}\n{second[l2]}\n{third[l3]}",
+        'date': format_date(epoch_ms)
+    }
+
+def pack_records(records):
+    """Pack an iterable of records into one bytes buffer"""
+    return b''.join(RECORD.pack(*record) for record in records)
+
+def unpack_records(buffer):
+    """Unpack a buffer of fixed-width records into a list of tuples"""
+    if len(buffer) % RECORD.size:
+        raise ValueError(f"Truncated record file ({len(buffer)} bytes)")
+    return list(RECORD.iter_unpack(buffer))
+
+def read_records(path=RECORDS_PATH):
+    """Read every record, oldest first, with a single buffer read"""
+    try:
+        with open(path, 'rb') as f:
+            return unpack_records(f.read())
+    except FileNotFoundError:
+        return []
+
+def read_range(start, stop=None, path=RECORDS_PATH):
+    """Read records [start, stop) (oldest-first positions) without the rest"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(start * RECORD.size)
+            if stop is None:
+                return unpack_records(f.read())
+            return unpack_records(f.read(max(0, stop - start) * RECORD.size))
+    except FileNotFoundError:
+        return []
+
+def read_tail(count, path=RECORDS_PATH):
+    """Read only the newest `count` records (oldest first)"""
+    try:
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - count * RECORD.size))
+            return unpack_records(f.read())
+    except FileNotFoundError:
+        return []
+
+def write_atomic(path, data):
+    """Replace path with data (text or bytes) through a temp file, so
+    readers see either the old file or the new one. The temp name is per
+    process, so concurrent runs writing the same file do not collide.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if isinstance(data, bytes):
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+def write_json(path, data, compact=False):
+    """Write data as JSON atomically (compact drops the whitespace)"""
+    if compact:
+        write_atomic(path, json.dumps(data, separators=(',', ':')))
+    else:
+        write_atomic(path, json.dumps(data, indent=2))
+
+def load_json(path):
+    """The data of a JSON file, or None if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def generation_path(path=RECORDS_PATH):
+    return path + '.gen'
+
+def log_generation(path=RECORDS_PATH):
+    """How many times the log has been rewritten rather than appended to.
+
+    Stores that remember log positions (counts, page numbers, poem ids)
+    record the generation they were built from and rebuild when it has
+    moved on. Read it before reading the log.
+    """
+    return load_json(generation_path(path)) or 0
+
+def bump_generation(path=RECORDS_PATH):
+    """Mark the log as rewritten (call after replacing it)"""
+    generation = log_generation(path) + 1
+    write_json(generation_path(path), generation)
+    return generation
+
+def write_records(records, path=RECORDS_PATH):
+    """Replace the record file atomically"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, pack_records(records))
+    bump_generation(path)
+
+def append_records(records, path=RECORDS_PATH):
+    """Append records to the end of the file (records must be newer).
+
+    Returns the number of records in the file afterwards.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(pack_records(records))
+        return f.tell() // RECORD.size
+
+def count_records(path=RECORDS_PATH):
+    """Number of records, from the file size alone"""
+    try:
+        return os.path.getsize(path) // RECORD.size
+    except FileNotFoundError:
+        return 0
+
+def write_poems_json(poems, path=POEMS_JSON_PATH):
+    """Materialize a newest-first poem list as poems.json (atomically),
+    with its poems.count.json sidecar
+    """
+    write_json(path, poems)
+    poem_stream.write_count(path, len(poems), poems[0]['date'] if poems else None)
+    return poems
+
+def export_json(records, path=POEMS_JSON_PATH):
+    """Write the newest-first poems.json view of the records"""
+    return write_poems_json([record_to_poem(record) for record in reversed(records)], path)
+
+def convert_json(json_path=POEMS_JSON_PATH, path=RECORDS_PATH):
+    """Build the record file from a poems.json style archive"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        poems = json.load(f)
+    if isinstance(poems, dict):  # final_poems.json wraps the list
+        poems = poems['poems']
+
+    records = []
+    skipped = []
+    for poem in poems:
+        try:
+            records.append(poem_to_record(poem))
+        except ValueError as e:
+            skipped.append((poem, str(e)))
+
+    records.sort(key=lambda record: record[3])
+    write_records(records, path)
+    return records, skipped
+
+def main():
+    """Convert poems.json (or the file given) into data/poems.bin"""
+    json_path = sys.argv[1] if len(sys.argv) > 1 else POEMS_JSON_PATH
+    path = sys.argv[2] if len(sys.argv) > 2 else RECORDS_PATH
+
+    records, skipped = convert_json(json_path, path)
+
+    json_size = os.path.getsize(json_path)
+    records_size = os.path.getsize(path)
+    print(f"Converted {len(records)} poems into {path}")
+    for poem, reason in skipped:
+        print(f"  skipped {poem.get('date')}: {reason}")
+    print(f"{json_size:,} bytes -> {records_size:,} bytes "
+          f"({json_size / max(records_size, 1):.1f}x smaller)")
+
+if __name__ == "__main__":
+    main()
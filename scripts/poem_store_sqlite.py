@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Optional SQLite poem store
+Keeps poems as line ids + epoch milliseconds in data/poems.sqlite, with
+indexes on the date and on each line position, so "last 30 days",
+"page N" and "every poem using line X" are indexed queries instead of a
+scan of the whole archive. Writes are batched in WAL mode.
+Run from scripts/ directory: python3 poem_store_sqlite.py [--sync]
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+import poem_records
+
+DB_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'poems.sqlite')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS poems (
+    id INTEGER PRIMARY KEY,
+    l1 INTEGER NOT NULL,
+    l2 INTEGER NOT NULL,
+    l3 INTEGER NOT NULL,
+    epoch_ms INTEGER NOT NULL,
+    UNIQUE (epoch_ms, l1, l2, l3)  -- doubles as the date index
+);
+CREATE INDEX IF NOT EXISTS poems_l1 ON poems (l1);
+CREATE INDEX IF NOT EXISTS poems_l2 ON poems (l2);
+CREATE INDEX IF NOT EXISTS poems_l3 ON poems (l3);
+'''
+
+BATCH_SIZE = 10_000
+
+# Records re-read from the log on sync in case its tail was re-sorted
+SYNC_OVERLAP = 100
+
+class PoemStore:
+    """Poems in SQLite, read back as poem_records records or poem dicts"""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, records):
+        """Insert records in batched transactions; duplicates are ignored"""
+        records = iter(records)
+        added = 0
+        while True:
+            batch = [record for _, record in zip(range(BATCH_SIZE), records)]
+            if not batch:
+                return added
+            with self.db:
+                before = self.db.total_changes
+                self.db.executemany(
+                    'INSERT OR IGNORE INTO poems (l1, l2, l3, epoch_ms) VALUES (?, ?, ?, ?)',
+                    batch)
+                added += self.db.total_changes - before
+
+    def sync_from_log(self, records_path=poem_records.RECORDS_PATH):
+        """Add whatever the poem log has that the store does not yet have.
+
+        The log only grows at the end (the writer may re-sort a few records
+        there), so only its tail past what the store holds is read, unless
+        the log was rewritten since the last sync (user_version keeps its
+        generation); then all of it is.
+        """
+        generation = poem_records.log_generation(records_path)
+        if self.db.execute('PRAGMA user_version').fetchone()[0] != generation:
+            start = 0
+        else:
+            start = max(0, self.count() - SYNC_OVERLAP)
+        added = self.add(poem_records.read_range(start, None, records_path))
+        self.db.execute(f'PRAGMA user_version = {int(generation)}')
+        return added
+
+    def count(self):
+        return self.db.execute('SELECT COUNT(*) FROM poems').fetchone()[0]
+
+    def _records(self, sql, params=()):
+        return [tuple(row) for row in self.db.execute(sql, params)]
+
+    def since(self, epoch_ms):
+        """Records at or after epoch_ms, newest first"""
+        return self._records(
+            'SELECT l1, l2, l3, epoch_ms FROM poems WHERE epoch_ms >= ? '
+            'ORDER BY epoch_ms DESC', (epoch_ms,))
+
+    def last_days(self, days=30, now_ms=None):
+        """Records from the last `days` days, newest first"""
+        now_ms = now_ms if now_ms is not None else time.time_ns() // 1_000_000
+        return self.since(now_ms - days * poem_records.DAY_MS)
+
+    def page(self, number, size=10):
+        """Page `number` (1-based) of the newest-first listing"""
+        return self._records(
+            'SELECT l1, l2, l3, epoch_ms FROM poems ORDER BY epoch_ms DESC LIMIT ? OFFSET ?',
+            (size, (number - 1) * size))
+
+    def using_line(self, position, index):
+        """Every record using line `index` at position 1, 2 or 3, newest first"""
+        if position not in (1, 2, 3):
+            raise ValueError(f"Line position must be 1, 2 or 3, not {position}")
+        return self._records(
+            f'SELECT l1, l2, l3, epoch_ms FROM poems WHERE l{position} = ? '
+            f'ORDER BY epoch_ms DESC', (index,))
+
+def main():
+    """Build or sync data/poems.sqlite from the poem log and show a few queries"""
+    with PoemStore() as store:
+        if '--sync' in sys.argv[1:] or not store.count():
+            added = store.sync_from_log()
+            print(f"Added {added} poems from {poem_records.RECORDS_PATH}")
+
+        print(f"{store.count()} poems in {DB_PATH}")
+        print(f"last 30 days: {len(store.last_days(30))} poems")
+        print(f"page 2: {[poem_records.format_date(r[3]) for r in store.page(2)][:3]} ...")
+        print(f"poems using first line 0: {len(store.using_line(1, 0))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Incremental reader for poems.json style archives
+Yields the poems of a JSON array (or of the "poems" list inside a wrapper
+object, as in final_poems.json) one at a time while reading the file in
+small chunks, so memory stays flat however large the archive is and a
+consumer can stop early. poems.json is newest first, so date-bounded
+readers stop at the cutoff, and a sidecar (poems.count.json) answers
+"how many poems?" without a parse.
+Run from scripts/ directory: python3 poem_stream.py [file] [count]
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from itertools import islice
+
+import poem_records
+
+CHUNK_SIZE = 1 << 16
+
+POEMS_JSON_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'poems.json')
+
+_decoder = json.JSONDecoder()
+
+def iter_poems(path=POEMS_JSON_PATH, key='poems', chunk_size=CHUNK_SIZE):
+    """Yield each object of the archive's poem list, in file order"""
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = f.read(chunk_size)
+        eof = not buf
+
+        # Find the opening bracket: top-level, or after "key": in a wrapper
+        while True:
+            start = buf.lstrip()[:1]
+            if start == '[':
+                pos = buf.index('[') + 1
+                break
+            marker = buf.find(f'"{key}"') if start == '{' else -1
+            bracket = buf.find('[', marker) if marker >= 0 else -1
+            if bracket >= 0:
+                pos = bracket + 1
+                break
+            if eof:
+                raise ValueError(f"{path}: no poem list found")
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf += chunk
+
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+            try:
+                if pos >= len(buf):
+                    raise json.JSONDecodeError('Need more data', buf, pos)
+                poem, pos = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"{path}: truncated poem list") from None
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield poem
+
+def iter_since(cutoff, path=POEMS_JSON_PATH):
+    """Yield newest-first poems until the first one dated before cutoff.
+
+    cutoff is an aware datetime; the rest of the file is never read.
+    """
+    for poem in iter_poems(path):
+        if datetime.fromisoformat(poem['date'].replace('Z', '+00:00')) < cutoff:
+            return
+        yield poem
+
+def newest(count, path=POEMS_JSON_PATH):
+    """The first `count` poems of a newest-first archive"""
+    return list(islice(iter_poems(path), count))
+
+def count_path(path):
+    return os.path.splitext(path)[0] + '.count.json'
+
+def write_count(path, total, newest_date):
+    """Record the poem count of path in its sidecar"""
+    sidecar = {
+        'total': total,
+        'size': os.path.getsize(path),
+        'newest': newest_date
+    }
+    poem_records.write_json(count_path(path), sidecar)
+
+def count_poems(path=POEMS_JSON_PATH):
+    """Number of poems in path: from the sidecar when it still matches the
+    file (same size and newest poem), otherwise by streaming and refreshing it
+    """
+    first = newest(1, path)
+    newest_date = first[0]['date'] if first else None
+    try:
+        with open(count_path(path), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar['size'] == os.path.getsize(path) and sidecar['newest'] == newest_date:
+            return sidecar['total']
+    except (FileNotFoundError, KeyError, ValueError):
+        pass
+
+    total = sum(1 for _ in iter_poems(path))
+    try:
+        write_count(path, total, newest_date)
+    except OSError:
+        pass
+    return total
+
+def main():
+    """Print the first few poems of an archive without loading all of it"""
+    path = sys.argv[1] if len(sys.argv) > 1 else POEMS_JSON_PATH
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    for i, poem in enumerate(iter_poems(path)):
+        if i == count:
+            break
+        print(poem['date'])
+        print(poem['content'])
+        print()
+
+if __name__ == "__main__":
+    main()
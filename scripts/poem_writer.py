@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Group-commit writer for the poem log
+Any number of producers (the scheduler, a manual run, a backfill) can
+submit poems at once. Each one drops its records into a spool file and
+then takes the commit lock; whoever holds it moves the whole spool aside
+with an atomic rename and commits every pending poem in one write + fsync.
+Producers whose poems were swept up by another process just return.
+Run from scripts/ directory: python3 poem_writer.py [producers] [poems_each]
+"""
+
+import fcntl
+import glob
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from multiprocessing import Pool
+
+import poem_records
+from poem_records import RECORD
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive flock on path for the duration of the block"""
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+class GroupCommitWriter:
+    """Serialises producers of data/poems.bin and batches their appends"""
+
+    def __init__(self, path=poem_records.RECORDS_PATH):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.spool_path = path + '.pending'
+        self.spool_lock_path = path + '.pending.lock'
+
+    def submit(self, records):
+        """Queue records and return once they are committed.
+
+        Returns the number of poems in the log afterwards.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with file_lock(self.spool_lock_path):
+            with open(self.spool_path, 'ab') as f:
+                f.write(poem_records.pack_records(records))
+
+        with file_lock(self.lock_path):
+            self.commit_pending()
+            return poem_records.count_records(self.path)
+
+    def commit_pending(self):
+        """Commit everything in the spool (caller holds the commit lock)"""
+        with file_lock(self.spool_lock_path):
+            try:
+                os.replace(self.spool_path, f"{self.spool_path}.{os.getpid()}.{time.time_ns()}")
+            except FileNotFoundError:
+                pass
+
+        # Batches left behind by a crashed leader are picked up too
+        batch_paths = sorted(glob.glob(glob.escape(self.spool_path) + '.*.*'))
+        batch = []
+        for batch_path in batch_paths:
+            with open(batch_path, 'rb') as f:
+                raw = f.read()
+            batch.extend(poem_records.unpack_records(raw[:len(raw) - len(raw) % RECORD.size]))
+
+        if batch:
+            self._append_sorted(batch)
+        for batch_path in batch_paths:
+            os.unlink(batch_path)
+        return len(batch)
+
+    def _append_sorted(self, batch):
+        """Write a batch at the end of the log, keeping it sorted by date"""
+        batch.sort(key=lambda record: (record[3], record[:3]))
+        oldest = batch[0][3]
+
+        with open(self.path, 'a+b') as f:
+            size = f.seek(0, os.SEEK_END)
+            size -= size % RECORD.size  # drop a torn record from an interrupted write
+
+            # Usually nothing in the log is newer than the batch; if a slow
+            # producer's poem is older, re-sort just the overlapping tail
+            start = size
+            tail = []
+            while start:
+                f.seek(start - RECORD.size)
+                record = RECORD.unpack(f.read(RECORD.size))
+                if record[3] < oldest:
+                    break
+                tail.append(record)
+                start -= RECORD.size
+
+            merged = sorted(set(tail) | set(batch), key=lambda record: (record[3], record[:3]))
+            if not tail:
+                f.truncate(size)
+                f.write(poem_records.pack_records(merged))
+                f.flush()
+                os.fsync(f.fileno())
+                return
+            f.seek(0)
+            prefix = f.read(start)
+
+        # Committed poems are never cut from the live log: the re-sorted
+        # copy is made durable first and then swapped in
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(prefix)
+            f.write(poem_records.pack_records(merged))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        poem_records.bump_generation(self.path)
+        dir_fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def submit(records, path=poem_records.RECORDS_PATH):
+    """Commit records to the poem log through the group-commit writer"""
+    return GroupCommitWriter(path).submit(records)
+
+def _produce(args):
+    path, producer, count = args
+    for i in range(count):
+        submit([(producer, i % 418, 0, time.time_ns() // 1_000_000)], path)
+
+def main():
+    """Stress test: concurrent producers against a scratch log"""
+    producers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'poems.bin')
+        t = time.perf_counter()
+        with Pool(producers) as pool:
+            pool.map(_produce, [(path, p, count) for p in range(producers)])
+        elapsed = time.perf_counter() - t
+
+        records = poem_records.read_records(path)
+        in_order = all(a[3] <= b[3] for a, b in zip(records, records[1:]))
+        print(f"{producers} producers x {count} poems: {len(records)} committed "
+              f"in {elapsed:.2f} s ({'sorted' if in_order else 'NOT sorted'})")
+
+if __name__ == "__main__":
+    main()
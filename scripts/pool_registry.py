@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Per-position line pools with O(1) weighted sampling
+The registry carries each position's own pool and size (they do not have
+to match) plus a weight per line. Weights come from data/line_weights.json
+(favourites) and can be lowered for lines used in recent poems; every draw
+goes through a Vose alias table, so it stays O(1) however often the
+weights change.
+Run from scripts/ directory: python3 pool_registry.py [count]
+"""
+
+import json
+import os
+import random
+import sys
+
+import line_catalog
+import poem_records
+
+WEIGHTS_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'line_weights.json')
+
+# Recently published lines are drawn this many times less often
+RECENT_POEMS = 28
+RECENT_FACTOR = 0.25
+
+class AliasTable:
+    """Vose's alias method: O(n) to build, O(1) per draw"""
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive total")
+
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:  # leftovers are 1 up to rounding
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng=random):
+        i = rng.randrange(len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+class LinePool:
+    """One position's lines and their weights"""
+
+    def __init__(self, name, lines):
+        if not lines:
+            raise ValueError(f"Pool {name!r} is empty")
+        if len(lines) > 0xFFFF:
+            raise ValueError(f"Pool {name!r} has {len(lines)} lines; poems.bin stores uint16 ids")
+        self.name = name
+        self.lines = lines
+        self.weights = [1.0] * len(lines)
+        self._table = None
+
+    def __len__(self):
+        return len(self.lines)
+
+    def set_weight(self, index, weight):
+        if not 0 <= index < len(self.lines):
+            raise IndexError(f"{self.name}: no line {index} (pool has {len(self.lines)})")
+        if weight < 0:
+            raise ValueError(f"{self.name}: negative weight for line {index}")
+        self.weights[index] = float(weight)
+        self._table = None
+
+    def sample(self, rng=random):
+        if self._table is None:
+            self._table = AliasTable(self.weights)
+        return self._table.sample(rng)
+
+class PoolRegistry:
+    """The first, second and third line pools with their sizes and weights"""
+
+    def __init__(self, first, second, third):
+        self.pools = (
+            LinePool('first_lines', first),
+            LinePool('second_lines', second),
+            LinePool('third_lines', third),
+        )
+
+    @classmethod
+    def from_catalog(cls):
+        return cls(*line_catalog.load_lines())
+
+    @property
+    def sizes(self):
+        return tuple(len(pool) for pool in self.pools)
+
+    def load_weights(self, path=WEIGHTS_PATH):
+        """Apply {"first_lines": {"<index>": weight, ...}, ...} from a JSON file"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                weights = json.load(f)
+        except FileNotFoundError:
+            return self
+
+        for pool in self.pools:
+            for index, weight in weights.get(pool.name, {}).items():
+                pool.set_weight(int(index), weight)
+        return self
+
+    def penalize_recent(self, records, factor=RECENT_FACTOR):
+        """Scale down the weight of every line used by the given records"""
+        for record in records:
+            for pool, index in zip(self.pools, record[:3]):
+                pool.set_weight(index, pool.weights[index] * factor)
+        return self
+
+    def sample(self, rng=random):
+        """Draw one (l1, l2, l3) triple, O(1) per position"""
+        return tuple(pool.sample(rng) for pool in self.pools)
+
+def weighted_registry(recent=RECENT_POEMS):
+    """The catalog pools with favourite weights and a recent-use penalty"""
+    registry = PoolRegistry.from_catalog().load_weights()
+    return registry.penalize_recent(poem_records.read_tail(recent))
+
+def main():
+    """Show a few weighted draws"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    registry = weighted_registry()
+    print(f"Pool sizes: {' x '.join(map(str, registry.sizes))}")
+
+    for _ in range(count):
+        l1, l2, l3 = registry.sample()
+        print()
+        print('\n'.join(pool.lines[i] for pool, i in zip(registry.pools, (l1, l2, l3))))
+
+if __name__ == "__main__":
+    main()
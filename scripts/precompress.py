@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Precompressed siblings of the published artifacts
+Writes page.gz (and page.br when the brotli package is installed) next to
+poems.json, rss.xml, archive.html and, as each run writes them, the page,
+static archive and search files, so a static host can serve them
+compressed without doing the work per request. A sibling is only
+rewritten when the artifact's content has changed.
+Run from scripts/ directory: python3 precompress.py [files...]
+"""
+
+import gzip
+import os
+import sys
+
+import poem_records
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip siblings are always written
+    brotli = None
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+ARTIFACTS = [
+    os.path.join(ROOT, 'data', 'poems.json'),
+    os.path.join(ROOT, 'rss.xml'),
+    os.path.join(ROOT, 'archive.html'),
+]
+
+def _gzip(data):
+    # mtime=0 keeps the output a pure function of the content
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+CODECS = [('.gz', _gzip, gzip.decompress)]
+if brotli is not None:
+    CODECS.append(('.br', lambda data: brotli.compress(data, quality=11), brotli.decompress))
+
+def _unchanged(sibling_path, decompress, data):
+    try:
+        with open(sibling_path, 'rb') as f:
+            return decompress(f.read()) == data
+    except Exception:  # missing or corrupt (gzip and brotli raise different errors)
+        return False
+
+def precompress(path):
+    """Write the compressed siblings of path that are missing or stale.
+
+    Returns the sibling paths that were written.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    written = []
+    for suffix, compress, decompress in CODECS:
+        sibling_path = path + suffix
+        if _unchanged(sibling_path, decompress, data):
+            continue
+        poem_records.write_atomic(sibling_path, compress(data))
+        written.append(sibling_path)
+    return written
+
+def remove(path):
+    """Delete an artifact together with its compressed siblings"""
+    for suffix in ('', '.gz', '.br'):
+        try:
+            os.unlink(path + suffix)
+        except FileNotFoundError:
+            pass
+
+def precompress_all(paths=ARTIFACTS):
+    """Precompress every artifact that exists; returns the siblings written"""
+    return [sibling for path in paths if os.path.exists(path)
+            for sibling in precompress(path)]
+
+def main():
+    """Precompress the published artifacts and report the savings"""
+    paths = sys.argv[1:] or ARTIFACTS
+    written = precompress_all(paths)
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        sizes = ', '.join(f"{suffix} {os.path.getsize(path + suffix):,}"
+                          for suffix, _, _ in CODECS if os.path.exists(path + suffix))
+        print(f"{os.path.basename(path):<14} {os.path.getsize(path):>10,} bytes -> {sizes}")
+    print(f"{len(written)} sibling(s) written")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Bitset of every combination ever published
+One bit per haiku id over the whole |L1| x |L2| x |L3| space (73M bits,
+about 9 MB) in data/published.bits, memory-mapped, so "already
+published?" is a single bit test and the fraction of the space explored
+is a popcount. The bulk builder fills it from the archives in one
+vectorized pass; afterwards only new poems in the log are added.
+Run from scripts/ directory: python3 published_set.py [--build]
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+import haiku_space
+import poem_records
+import poem_stream
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the builder falls back to a loop
+    np = None
+
+BITS_PATH = os.path.join(poem_records.DATA_DIR, 'published.bits')
+
+BUILD_INPUTS = [
+    poem_records.RECORDS_PATH,
+    os.path.join(poem_records.DATA_DIR, 'poems.json'),
+    os.path.join(poem_records.DATA_DIR, 'poems_old.json'),
+    os.path.join(poem_records.DATA_DIR, 'final_poems.json'),
+]
+
+# <magic, space size, poem log records already added, log generation>
+HEADER = struct.Struct('<4sQQQ')
+MAGIC = b'HKBS'
+
+def _bytes_for(size):
+    return (size + 7) // 8
+
+def iter_triples(path):
+    """Line triples from a .bin log or a JSON archive (unknown lines skipped)"""
+    if path.endswith('.bin'):
+        for l1, l2, l3, _ in poem_records.read_records(path):
+            yield l1, l2, l3
+        return
+    for poem in poem_stream.iter_poems(path):
+        try:
+            yield haiku_space.text_to_triple(poem['content'])
+        except (ValueError, KeyError):
+            continue
+
+def build(inputs=BUILD_INPUTS, path=BITS_PATH, records_path=poem_records.RECORDS_PATH):
+    """Write a fresh bitset from the archives (atomically)"""
+    generation = poem_records.log_generation(records_path)
+    size = haiku_space.space_size()
+    n1, n2, n3 = haiku_space.pool_sizes()
+    triples = [triple for input_path in inputs if os.path.exists(input_path)
+               for triple in iter_triples(input_path)]
+
+    if np is not None:
+        lines = np.array(triples, dtype=np.int64).reshape(-1, 3)
+        ids = np.unique((lines[:, 0] * n2 + lines[:, 1]) * n3 + lines[:, 2])
+        bits = np.zeros(_bytes_for(size), dtype=np.uint8)
+        np.bitwise_or.at(bits, ids >> 3, (1 << (ids & 7)).astype(np.uint8))
+        bits = bits.tobytes()
+    else:
+        bits = bytearray(_bytes_for(size))
+        for l1, l2, l3 in triples:
+            haiku_id = (l1 * n2 + l2) * n3 + l3
+            bits[haiku_id >> 3] |= 1 << (haiku_id & 7)
+
+    covered = poem_records.count_records(records_path) if os.path.exists(records_path) else 0
+    poem_records.write_atomic(path, HEADER.pack(MAGIC, size, covered, generation) + bytes(bits))
+
+class PublishedSet:
+    """The memory-mapped bitset; `haiku_id in published` is one bit test"""
+
+    def __init__(self, path=BITS_PATH):
+        self.path = path
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.size, self.covered, self.generation = HEADER.unpack_from(self._map)
+        if magic != MAGIC or len(self._map) != HEADER.size + _bytes_for(self.size):
+            self.close()
+            raise ValueError(f"{path} is not a published-combination bitset")
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, haiku_id):
+        return bool(self._map[HEADER.size + (haiku_id >> 3)] & (1 << (haiku_id & 7)))
+
+    def add(self, haiku_id):
+        offset = HEADER.size + (haiku_id >> 3)
+        self._map[offset] |= 1 << (haiku_id & 7)
+
+    def sync_from_log(self, records_path=poem_records.RECORDS_PATH):
+        """Add the poems appended to the log since the last sync"""
+        records = poem_records.read_range(self.covered, None, records_path)
+        for l1, l2, l3, _ in records:
+            self.add(haiku_space.rank(l1, l2, l3))
+        self.covered += len(records)
+        HEADER.pack_into(self._map, 0, MAGIC, self.size, self.covered, self.generation)
+        return len(records)
+
+    def count(self):
+        """Number of distinct combinations published"""
+        return int.from_bytes(self._map[HEADER.size:], 'little').bit_count()
+
+    def explored(self):
+        """Fraction of the whole space published so far"""
+        return self.count() / self.size
+
+def load(path=BITS_PATH, records_path=poem_records.RECORDS_PATH):
+    """Open the bitset, building it if it is missing, the pools have changed
+    or the log was rewritten, and add any poems logged since it was last used
+    """
+    try:
+        published = PublishedSet(path)
+    except (FileNotFoundError, ValueError):
+        published = None
+    if published is not None and (published.size != haiku_space.space_size()
+                                  or published.generation != poem_records.log_generation(records_path)):
+        published.close()
+        published = None
+    if published is None:
+        build(path=path, records_path=records_path)
+        published = PublishedSet(path)
+
+    if os.path.exists(records_path):
+        published.sync_from_log(records_path)
+    return published
+
+def main():
+    """Build (--build) or refresh the bitset and report how much is explored"""
+    if '--build' in sys.argv[1:]:
+        build()
+        print(f"Built {BITS_PATH} ({os.path.getsize(BITS_PATH):,} bytes)")
+
+    with load() as published:
+        print(f"{published.count():,} of {published.size:,} combinations published "
+              f"({published.explored():.5%} of the space explored)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Sharded inverted index for archive search
+Poems are built from known lines, so the index maps word -> "position:line"
+-> poem ids (a poem's id is its position in the oldest-first poem log,
+which also locates it in the data/pages files). Words are sharded by
+their first two letters into data/search/<prefix>.json, so the browser
+fetches one small shard per query term. New poems only touch the shards
+of their own words.
+Run from scripts/ directory: python3 search_index.py [--rebuild | word]
+"""
+
+import hashlib
+import os
+import re
+import sys
+
+import archive_pages
+import haiku_space
+import poem_records
+import precompress
+
+SEARCH_DIR = os.path.join(poem_records.DATA_DIR, 'search')
+MANIFEST_NAME = 'manifest.json'
+
+# Keep in step with WORD / shardName() in the archive index page's script
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)*")
+
+_line_words = None
+
+def words(text):
+    """The distinct search words of a line or poem"""
+    return set(WORD.findall(text.lower().replace('’', "'")))
+
+def shard_name(word):
+    return re.sub(r'[^a-z0-9]', '_', word[:2]).ljust(2, '_')
+
+def shard_path(name, search_dir=SEARCH_DIR):
+    return os.path.join(search_dir, f"{name}.json")
+
+def manifest_path(search_dir=SEARCH_DIR):
+    return os.path.join(search_dir, MANIFEST_NAME)
+
+def line_words():
+    """Per position, the words of every line (computed once)"""
+    global _line_words
+    if _line_words is None:
+        _line_words = [[sorted(words(line)) for line in lines] for lines in haiku_space.pools()]
+    return _line_words
+
+def pools_digest():
+    """Fingerprint of the line pools; line ids and words are only valid for it"""
+    text = '\n\n'.join('\n'.join(lines) for lines in haiku_space.pools())
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+def load_manifest(search_dir=SEARCH_DIR):
+    return poem_records.load_json(manifest_path(search_dir))
+
+def _load_shard(search_dir, name):
+    return poem_records.load_json(shard_path(name, search_dir)) or {}
+
+def update_index(records_path=poem_records.RECORDS_PATH, search_dir=SEARCH_DIR, rebuild=False):
+    """Index the poems of the log not yet indexed.
+
+    Only the new poems are read from the log, and only the shards holding
+    their words are read and rewritten. Returns the names of the shards
+    written.
+    """
+    digest = pools_digest()
+    generation = poem_records.log_generation(records_path)
+    total = poem_records.count_records(records_path)
+    manifest = load_manifest(search_dir)
+    if (rebuild or manifest is None or manifest['pools'] != digest
+            or manifest.get('generation') != generation or manifest['total'] > total):
+        start = 0
+        names = set()
+        fresh = True
+    else:
+        start = manifest['total']
+        names = set(manifest['shards'])
+        fresh = False
+
+    os.makedirs(search_dir, exist_ok=True)
+    index = line_words()
+    shards = {}
+    for poem_id, record in enumerate(poem_records.read_range(start, total, records_path), start):
+        for position, line in enumerate(record[:3]):
+            key = f"{position + 1}:{line}"
+            for word in index[position][line]:
+                name = shard_name(word)
+                shard = shards.get(name)
+                if shard is None:
+                    shard = shards[name] = {} if fresh else _load_shard(search_dir, name)
+                shard.setdefault(word, {}).setdefault(key, []).append(poem_id)
+
+    for name, shard in shards.items():
+        poem_records.write_json(shard_path(name, search_dir), shard, compact=True)
+    if fresh:
+        # Shards of a previous index that no word maps to any more
+        for name in set(manifest['shards'] if manifest else ()) - set(shards):
+            precompress.remove(shard_path(name, search_dir))
+
+    poem_records.write_json(manifest_path(search_dir), {
+        'total': total,
+        'generation': generation,
+        'pools': digest,
+        'page_size': archive_pages.PAGE_SIZE,
+        'shards': sorted(names | set(shards))
+    }, compact=True)
+    return sorted(shards)
+
+def lookup(word, search_dir=SEARCH_DIR):
+    """Ids of the poems containing word, as the browser would find them"""
+    shard = _load_shard(search_dir, shard_name(word))
+    return sorted({poem_id for poems in shard.get(word, {}).values() for poem_id in poems})
+
+def main():
+    """Update (or rebuild) data/search, or look a word up in it"""
+    args = sys.argv[1:]
+    if args and args[0] != '--rebuild':
+        ids = lookup(args[0].lower())
+        print(f"{len(ids)} poems contain {args[0]!r}")
+        for record in (poem_records.read_range(i, i + 1)[0] for i in ids[-3:]):
+            print(haiku_space.id_to_text(haiku_space.rank(*record[:3])))
+            print()
+        return
+
+    written = update_index(rebuild='--rebuild' in args)
+    manifest = load_manifest()
+    print(f"Wrote {len(written)} of {len(manifest['shards'])} search shards "
+          f"({manifest['total']} poems)")
+
+if __name__ == "__main__":
+    main()
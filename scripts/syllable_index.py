@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Syllable-indexed constrained generation
+data/line_syllables.json holds a syllable count for every line in the
+pools, estimated by count_syllables(), plus hand corrections keyed by
+line text under "corrections", which win over the estimates and survive
+rebuilds. Lines are bucketed by count, so a pattern such as 5-7-5, with
+or without a tolerance, maps to one candidate list per position: every
+draw is O(1) and the size of the valid subspace is just the product of
+list lengths.
+Run from scripts/ directory: python3 syllable_index.py [--build] [5-7-5] [tolerance]
+"""
+
+import json
+import os
+import random
+import re
+import sys
+
+import haiku_space
+import line_catalog
+import poem_records
+
+TABLE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'line_syllables.json')
+
+# Words the vowel-group heuristic gets wrong
+WORD_OVERRIDES = {
+    'fire': 2, 'fires': 2, 'hour': 1, 'hours': 1, 'our': 1, 'the': 1,
+    'every': 3, 'evening': 2, 'different': 3, 'poem': 2, 'poems': 2,
+    'being': 2, 'beings': 2, 'quiet': 2, 'create': 2, 'creates': 2,
+    'created': 3, 'creative': 3, 'real': 1, 'reality': 4, 'idea': 3,
+    'ideas': 3, 'area': 3, 'linear': 3, 'people': 2, 'naive': 2,
+    'someone': 2, 'something': 2, 'sometimes': 2, 'somewhere': 2,
+    'everything': 3, 'everyone': 3, 'everywhere': 3, 'forever': 3,
+    'whatever': 3, 'chaos': 2, 'cruel': 2, 'fluid': 2, 'violet': 3,
+    'flower': 2, 'flowers': 2, 'power': 2, 'tower': 2, 'shower': 2,
+    'orientation': 5, 'permeate': 3, 'silhouette': 3, 'silhouettes': 3,
+    'silouettes': 3, 'aerie': 2, 'simplest': 2, 'geometric': 4,
+    'grateful': 2, 'awareness': 3, 'entire': 3, 'ev’ry': 2,
+    'ev’ryone': 3, 'ev’rything': 3, 'maybe': 2, 'anyone': 3, 'anything': 3,
+    'anywhere': 3, 'naked': 2, 'wicked': 2, 'crooked': 2, 'rugged': 2,
+    'jagged': 2, 'ragged': 2, 'beloved': 3, 'poet': 2, 'poets': 2,
+    'poetry': 3, 'poetic': 3, 'somehow': 2, 'companion': 3, 'magnifying': 4,
+    'farewell': 2, 'brilliance': 2, 'anxiety': 4, 'creativity': 5,
+    'experience': 4, 'coalesce': 3, 'earlier': 3, 'rosemary': 3,
+    'celestial': 4, 'quietude': 3, 'quietness': 3, 'cassiopeia': 5,
+}
+
+WORD = re.compile(r"[a-z’']+")
+VOWEL_GROUP = re.compile(r'[aeiouy]+')
+# Vowel pairs usually said as two syllables: curious, aphelion, tributaries
+HIATUS = re.compile(r'i[aou]|eo|ao|ua|uou|oi(?=ng)')
+NON_HIATUS = re.compile(r'[tsc]h?io|[tsc]h?ia|qua|gua|eou')
+
+_index = None
+
+def count_word(word):
+    """Estimate the syllables in one lower-case word"""
+    word = word.replace("'", '’')
+    if word in WORD_OVERRIDES:
+        return WORD_OVERRIDES[word]
+    stem, _, suffix = word.partition('’')
+    if not stem:
+        return 0
+    if stem in WORD_OVERRIDES and suffix != 't':
+        return WORD_OVERRIDES[stem]  # fire’s, hour’s
+    stem = re.sub(r'y(?=[aeiou])', 'j', stem)  # y before a vowel is a consonant
+
+    count = len(VOWEL_GROUP.findall(stem))
+    count += len(HIATUS.findall(stem)) - len(NON_HIATUS.findall(stem))
+    if count > 1 and re.search(r'[^aeiou]e(ly|ness|ment|ful|fully|less|lessly)$', stem):
+        count -= 1  # silent e before a suffix: completely, movement, carefully
+    if count > 1 and stem.endswith('e') and not re.search(r'[^aeioul]le$|[ey]e$', stem):
+        count -= 1  # silent final e: stone, smile, but not little
+    elif count > 1 and stem.endswith('ed') and not re.search(
+            r'[td]ed$|[^aeioul]led$|[^aeiou]red$|ied$', stem):
+        count -= 1  # walked, filled, but not settled, hundred or buried
+    elif count > 1 and stem.endswith('es') and not re.search(
+            r'([sxz]|ch|sh|[cg]|[^aeioul]l|i|u|o)es$', stem):
+        count -= 1  # hopes, stones, but not bubbles, values, echoes
+    if suffix == 't' and re.search(r'[^aeiou]n$', stem):
+        count += 1  # isn't, wasn't, couldn't
+    elif suffix == 's' and re.search(r'([sxz]|ch|sh|[cgsz]e)$', stem):
+        count += 1  # rose’s, branch’s
+    return max(1, count)
+
+def count_syllables(line):
+    """Estimate the syllables in a line of text"""
+    return sum(count_word(word) for word in WORD.findall(line.lower()))
+
+def load_corrections(path=TABLE_PATH):
+    """The hand-corrected counts in the table, {line text: count}"""
+    table = poem_records.load_json(path)
+    return table.get('corrections', {}) if isinstance(table, dict) else {}
+
+def build_table(path=TABLE_PATH):
+    """Estimate counts for every line and write the syllable table,
+    keeping its hand corrections
+    """
+    corrections = load_corrections(path)
+    table = {
+        position: [corrections.get(line, count_syllables(line)) for line in lines]
+        for position, lines in zip(line_catalog.POSITIONS, line_catalog.load_lines())
+    }
+    table['corrections'] = corrections
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False)
+    return table
+
+def load_table(path=TABLE_PATH):
+    """Load the syllable table, rebuilding it if the pools changed size.
+
+    Hand corrections apply whether or not the counts were rebuilt since
+    they were made.
+    """
+    pools = line_catalog.load_lines()
+    table = poem_records.load_json(path)
+    try:
+        counts = [table[position] for position in line_catalog.POSITIONS]
+    except (KeyError, TypeError):
+        counts = None
+    if counts is None or [len(c) for c in counts] != [len(lines) for lines in pools]:
+        table = build_table(path)
+        counts = [table[position] for position in line_catalog.POSITIONS]
+
+    corrections = table.get('corrections', {})
+    return tuple([corrections.get(line, count) for line, count in zip(lines, position_counts)]
+                 for lines, position_counts in zip(pools, counts))
+
+class Subspace:
+    """The combinations whose lines fit a syllable constraint"""
+
+    def __init__(self, pattern, tolerance, candidates):
+        self.pattern = pattern
+        self.tolerance = tolerance
+        self.candidates = candidates
+
+    @property
+    def size(self):
+        """Exact number of combinations in the subspace"""
+        n1, n2, n3 = (len(c) for c in self.candidates)
+        return n1 * n2 * n3
+
+    def sample(self, rng=random):
+        """Draw one (l1, l2, l3) triple uniformly from the subspace"""
+        if not self.size:
+            raise ValueError(f"No combinations fit {self.pattern} ±{self.tolerance}")
+        return tuple(c[rng.randrange(len(c))] for c in self.candidates)
+
+class SyllableIndex:
+    """Line indices bucketed by syllable count, one bucket dict per position"""
+
+    def __init__(self, counts):
+        self.counts = counts
+        self.buckets = []
+        for position_counts in counts:
+            buckets = {}
+            for i, count in enumerate(position_counts):
+                buckets.setdefault(count, []).append(i)
+            self.buckets.append(buckets)
+        self._subspaces = {}
+
+    def subspace(self, pattern=(5, 7, 5), tolerance=0):
+        """The subspace matching pattern, each position within ±tolerance"""
+        key = (tuple(pattern), tolerance)
+        if key not in self._subspaces:
+            candidates = []
+            for target, buckets in zip(pattern, self.buckets):
+                lines = []
+                for count in range(target - tolerance, target + tolerance + 1):
+                    lines.extend(buckets.get(count, ()))
+                candidates.append(sorted(lines))
+            self._subspaces[key] = Subspace(key[0], tolerance, candidates)
+        return self._subspaces[key]
+
+def syllable_index():
+    """The shared index over data/line_syllables.json"""
+    global _index
+    if _index is None:
+        _index = SyllableIndex(load_table())
+    return _index
+
+def generate_constrained_haiku(pattern=(5, 7, 5), tolerance=0, rng=random):
+    """Generate a haiku whose lines fit pattern, in the shape of generate_haiku()"""
+    l1, l2, l3 = syllable_index().subspace(pattern, tolerance).sample(rng)
+    return {
+        'content': haiku_space.id_to_text(haiku_space.rank(l1, l2, l3)),
+        'lines': (l1, l2, l3),
+        'date': poem_records.now_date()
+    }
+
+def parse_pattern(text):
+    """Parse '5-7-5' into (5, 7, 5)"""
+    return tuple(int(part) for part in text.split('-'))
+
+def main():
+    """Report subspace sizes and show a constrained haiku"""
+    args = sys.argv[1:]
+    if '--build' in args:
+        args.remove('--build')
+        build_table()
+        print(f"Wrote {TABLE_PATH}")
+
+    pattern = parse_pattern(args[0]) if args else (5, 7, 5)
+    tolerance = int(args[1]) if len(args) > 1 else 0
+
+    index = syllable_index()
+    for tol in sorted({0, 1, tolerance}):
+        space = index.subspace(pattern, tol)
+        fits = ' x '.join(str(len(c)) for c in space.candidates)
+        print(f"{'-'.join(map(str, pattern))} ±{tol}: {fits} = {space.size:,} of "
+              f"{haiku_space.space_size():,} combinations")
+
+    print()
+    print(generate_constrained_haiku(pattern, tolerance)['content'])
+
+if __name__ == "__main__":
+    main()
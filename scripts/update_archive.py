@@ -1,38 +1,43 @@
 #!/usr/bin/env python3
 """
 Generate archive.html with lazy loading for 25k+ poems
-Run from scripts/ directory
+Run from scripts/ directory (use --export-json to also rewrite the full
+data/poems.json export, which the hourly run no longer does)
 """
 
-import json
 import os
-from datetime import datetime
-
-def load_poems():
-    """Load poems from JSON file"""
-    poems_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'poems.json')
-    try:
-        with open(poems_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-
-def generate_archive_html(poems):
-    """Generate archive.html with lazy loading (first 10 poems, then load more via JS)"""
+import sys
+
+import archive_blocks
+import archive_pages
+import archive_site
+import poem_data
+import poem_records
+import precompress
+import search_index
+
+def generate_archive_html(poems, total=None):
+    """Generate archive.html with lazy loading (first 10 poems, then page files via JS)
+
+    poems are poem_data.PoemRecord objects, newest first; they only need to
+    hold the newest page; pass total when it is not the whole archive.
+    """
+    total = len(poems) if total is None else total
     # Split poems into pages of 10
     limit = 10
     first_page_poems = poems[:limit]
-    has_next_page = len(poems) > limit
+    has_next_page = total > limit
+    # Page files are numbered from the oldest poem (see archive_pages.py)
+    newest_page = (total - 1) // archive_pages.PAGE_SIZE
 
     # Generate poems HTML for first page
     poems_html = ""
     for poem in first_page_poems:
-        poem_date = datetime.fromisoformat(poem['date'].replace('Z', '+00:00'))
-        formatted_date = poem_date.strftime('%B %d, %Y, %I:%M %p')
+        formatted_date = poem.when.strftime('%B %d, %Y, %I:%M %p')
 
         poems_html += f'''
                             <div class="poem">
-                                <pre>{poem['content']}</pre>
+                                <pre>{poem.content}</pre>
                                 <div class="date">
                                     {formatted_date}
                                 </div>
@@ -175,6 +180,7 @@ def generate_archive_html(poems):
                       <div class="nav-links">
                           <a href="/" class="back-link">&#8962;</a>
                           <a href="/rss.xml" class="back-link">RSS</a>
+                          <a href="/archive/index.html" class="back-link">Pages</a>
                       </div>
                   </div>
 
@@ -183,30 +189,28 @@ def generate_archive_html(poems):
                     <div id="loader" class="loader">Loading more poems...</div>
 
                     <script>
-                        // Only embed metadata, fetch full data as needed
-                        let allPoems = null; // Will be loaded on first scroll
-                        let currentPage = 2;
+                        // Older poems live in fixed-size page files under /data/pages/,
+                        // numbered from the oldest poem; fetch them newest first, one at a time
+                        let nextPageFile = {newest_page};
+                        let buffer = [];
+                        let toSkip = {len(first_page_poems)}; // Already rendered above
                         const limit = {limit};
                         let isLoading = false;
                         let hasNextPage = {str(has_next_page).lower()};
-                        const totalPoems = {len(poems)};
-
-                        async function loadAllPoems() {{
-                            if (allPoems) return allPoems; // Already loaded
-
-                            try {{
-                                console.log("Loading full poems data...");
-                                const response = await fetch('/data/poems.json');
-                                if (!response.ok) throw new Error('Failed to load poems');
-                                allPoems = await response.json();
-                                console.log("Loaded", allPoems.length, "poems");
-                                return allPoems;
-                            }} catch (error) {{
-                                console.error("Error loading poems:", error);
-                                // Fallback: disable further loading
-                                hasNextPage = false;
-                                document.getElementById('loader').style.display = 'none';
-                                return [];
+                        const totalPoems = {total};
+
+                        async function fillBuffer() {{
+                            while (buffer.length < limit && nextPageFile >= 0) {{
+                                const name = String(nextPageFile).padStart(6, '0');
+                                console.log("Loading archive page", name);
+                                const response = await fetch(`/data/pages/${{name}}.json`);
+                                if (!response.ok) throw new Error('Failed to load page ' + name);
+                                let poems = await response.json();
+                                nextPageFile--;
+
+                                const skipped = Math.min(toSkip, poems.length);
+                                toSkip -= skipped;
+                                buffer.push(...poems.slice(skipped));
                             }}
                         }}
 
@@ -215,16 +219,18 @@ def generate_archive_html(poems):
                             isLoading = true;
                             console.log("Loading more poems...");
 
-                            // Fetch all poems data if not already loaded
-                            const poems = await loadAllPoems();
-                            if (!poems.length) {{
+                            try {{
+                                await fillBuffer();
+                            }} catch (error) {{
+                                console.error("Error loading poems:", error);
+                                // Fallback: disable further loading
+                                hasNextPage = false;
+                                document.getElementById('loader').style.display = 'none';
                                 isLoading = false;
                                 return;
                             }}
 
-                            const startIndex = (currentPage - 1) * limit;
-                            const endIndex = startIndex + limit;
-                            const paginatedPoems = poems.slice(startIndex, endIndex);
+                            const paginatedPoems = buffer.splice(0, limit);
 
                             console.log("Rendering poems:", paginatedPoems.length);
 
@@ -241,8 +247,7 @@ def generate_archive_html(poems):
                                 poemsContainer.appendChild(poemDiv);
                             }});
 
-                            currentPage++;
-                            hasNextPage = endIndex < poems.length;
+                            hasNextPage = buffer.length > 0 || nextPageFile >= 0;
                             isLoading = false;
 
                             // Hide loader if no more pages
@@ -262,24 +267,75 @@ def generate_archive_html(poems):
 
     return html_template
 
-def main():
-    """Generate archive.html"""
-    # Load poems
-    poems = load_poems()
+def publish_archive(poems, total, records_path=None):
+    """Write archive.html from the newest poems.
 
+    Given the poem log's path, also bring the page files, static archive
+    pages, search shards and poems.blocks up to date; each reads only the
+    part of the log it has not seen yet.
+    """
     if not poems:
         print("No poems found. Run the haiku generator first.")
         return
 
     # Generate archive page with lazy loading
-    archive_content = generate_archive_html(poems)
+    archive_content = generate_archive_html(poems, total)
 
     # Save to parent directory (same level as scripts/)
     archive_path = os.path.join(os.path.dirname(__file__), '..', 'archive.html')
     with open(archive_path, 'w', encoding='utf-8') as f:
         f.write(archive_content)
 
-    print(f"Generated archive.html with {len(poems)} poems")
+    changed = [archive_path]
+    if records_path is not None:
+        # Only the page files that gained poems are rewritten
+        pages = archive_pages.update_pages(records_path)
+        print(f"Updated {len(pages)} archive page file(s)")
+        changed += [archive_pages.page_path(page) for page in pages]
+        changed.append(archive_pages.manifest_path())
+
+        # Static archive/page/N.html: only the newest page(s) and the index
+        pages = archive_site.update_site(records_path)
+        print(f"Rendered {len(pages)} static archive page(s) and the index")
+        changed += [archive_site.page_path(page) for page in pages]
+        changed.append(archive_site.index_path())
+
+        # Search shards: only those holding the new poems' words
+        shards = search_index.update_index(records_path)
+        print(f"Updated {len(shards)} search shard(s)")
+        changed += [search_index.shard_path(name) for name in shards]
+        changed.append(search_index.manifest_path())
+
+        # Block-compressed at-rest copy: only the last block is repacked
+        archive_blocks.update_blocks(records_path)
+
+    # gzip/brotli siblings of what this run wrote, when the content changed
+    written = precompress.precompress_all(changed)
+    print(f"Wrote {len(written)} precompressed file(s)")
+
+    print(f"Generated archive.html with {total} poems")
+
+def export_poems_json(records_path=poem_records.RECORDS_PATH,
+                      poems_path=poem_records.POEMS_JSON_PATH):
+    """Rewrite the whole newest-first poems.json export of the log, and its
+    compressed siblings. It costs as much as the rest of a run put together,
+    so it is a periodic job (see weekly_squash.sh), not part of every run.
+    """
+    records = poem_records.read_records(records_path)
+    poem_records.export_json(records, poems_path)
+    written = precompress.precompress(poems_path)
+    print(f"Exported {len(records)} poems to poems.json ({len(written)} precompressed file(s))")
+
+def main():
+    """Generate archive.html (and with --export-json, poems.json)"""
+    records_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'poems.bin')
+    # The newest page and the total come from the mapped log's tail (or,
+    # with no log yet, from poems.json, and there is nothing to update)
+    poems, total = poem_data.first_page(10, records_path)
+    publish_archive(poems, total, records_path if os.path.exists(records_path) else None)
+
+    if '--export-json' in sys.argv[1:] and os.path.exists(records_path):
+        export_poems_json(records_path)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,50 +1,48 @@
 #!/usr/bin/env python3
 """
 Generate rss.xml with same format as Node.js version
+By default the feed is maintained incrementally from data/rss_items.json
+(the rendered items currently in the feed); --full rebuilds it.
 Run from scripts/ directory
 """
 
-import json
 import os
-from datetime import datetime, timedelta
-
-def load_poems():
-    """Load poems from JSON file"""
-    poems_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'poems.json')
-    try:
-        with open(poems_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-
-def generate_rss_xml(poems, base_url="https://sohaiku.art"):
-    """Generate RSS feed XML in the exact same format as Node.js version"""
-    # Filter poems from last 30 days - use UTC timezone
-    from datetime import timezone
-    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    recent_poems = [
-        poem for poem in poems
-        if datetime.fromisoformat(poem['date'].replace('Z', '+00:00')) >= thirty_days_ago
-    ]
-
-    # Reference date: January 1, 2022 (same as Node.js)
-    reference_date = int(datetime(2022, 1, 1).timestamp())
-
-    rss_items = []
-    for poem in recent_poems:
-        poem_date_seconds = int(datetime.fromisoformat(poem['date'].replace('Z', '+00:00')).timestamp())
-        seconds_since_reference = poem_date_seconds - reference_date
-        content_snippet = poem['content'][:20].replace(' ', '').replace('\n', '').lower()
-        unique_guid = f"{seconds_since_reference}-{content_snippet}"
-
-        # Format date for RSS
-        pub_date = datetime.fromisoformat(poem['date'].replace('Z', '+00:00')).strftime('%a, %d %b %Y %H:%M:%S GMT')
-
-        # Get title and description (match Node.js exactly)
-        title = poem['content'].split('\n')[0]
-        description = poem['content'].replace('\n', '&lt;br&gt;')
-
-        rss_items.append(f'''    <item>
+import sys
+import time
+from datetime import datetime, timezone
+
+import poem_data
+import poem_records
+import precompress
+
+BASE_URL = "https://sohaiku.art"
+FEED_DAYS = 30
+
+RSS_PATH = os.path.join(os.path.dirname(__file__), '..', 'rss.xml')
+FEED_INDEX_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'rss_items.json')
+
+# Reference date: January 1, 2022 (same as Node.js)
+REFERENCE_DATE = int(datetime(2022, 1, 1).timestamp())
+
+def item_guid(poem):
+    """The feed guid of a poem: seconds since the reference date + a text snippet"""
+    seconds_since_reference = poem.epoch_ms // 1000 - REFERENCE_DATE
+    content_snippet = poem.content[:20].replace(' ', '').replace('\n', '').lower()
+    return f"{seconds_since_reference}-{content_snippet}"
+
+def render_item(poem, base_url=BASE_URL):
+    """The <item> element for one poem"""
+    unique_guid = item_guid(poem)
+
+    # Format date for RSS
+    pub_date = poem.when.strftime('%a, %d %b %Y %H:%M:%S GMT')
+
+    # Get title and description (match Node.js exactly)
+    content = poem.content
+    title = content.split('\n')[0]
+    description = content.replace('\n', '&lt;br&gt;')
+
+    return f'''    <item>
       <title>{title}</title>
       <description>{description}</description>
       <pubDate>{pub_date}</pubDate>
@@ -54,9 +52,11 @@ def generate_rss_xml(poems, base_url="https://sohaiku.art"):
       <category>botPoet</category>
       <guid>{unique_guid}</guid>
       <link>{base_url}/poems/{unique_guid}</link>
-    </item>''')
+    </item>'''
 
-    rss_content = f'''<?xml version="1.0" encoding="UTF-8"?>
+def rss_document(rss_items, base_url=BASE_URL):
+    """Wrap rendered <item> elements in the channel"""
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
 <rss version="2.0">
   <channel>
     <title>Serendipitous Oulipo Haiku</title>
@@ -66,39 +66,75 @@ def generate_rss_xml(poems, base_url="https://sohaiku.art"):
     <category>poetry</category>
     <category>haiku</category>
     <category>oulipo</category>
-    <lastBuildDate>{datetime.now().strftime('%a, %d %b %Y %H:%M:%S GMT')}</lastBuildDate>
+    <lastBuildDate>{datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')}</lastBuildDate>
 {chr(10).join(rss_items)}
   </channel>
 </rss>'''
 
-    return rss_content
-
-def main():
-    """Generate rss.xml"""
-    # Load poems
-    poems = load_poems()
+def load_feed_index(path=FEED_INDEX_PATH):
+    return poem_records.load_json(path)
+
+def save_feed_index(index, path=FEED_INDEX_PATH):
+    poem_records.write_json(path, index)
+
+def update_feed(poems_since=poem_data.poems_since, now_ms=None, base_url=BASE_URL,
+                index_path=FEED_INDEX_PATH, rss_path=RSS_PATH, rebuild=False,
+                records_path=poem_records.RECORDS_PATH):
+    """Bring rss.xml up to date, rendering only poems not yet in the feed.
+
+    data/rss_items.json keeps the rendered <item> of every poem in the feed.
+    Each run drops the items older than 30 days, renders the poems newer
+    than the newest item (poems_since(epoch_ms) returns them newest first)
+    and splices the two back into the channel. Without a usable index (or
+    without the rss_path it describes, or when the log at records_path was
+    rewritten since, which can sort poems in behind the newest item) the
+    whole 30-day window is rendered once, as with rebuild=True.
+    Returns (items, rendered).
+    """
+    now_ms = now_ms if now_ms is not None else time.time_ns() // 1_000_000
+    cutoff_ms = now_ms - FEED_DAYS * poem_records.DAY_MS
+
+    generation = poem_records.log_generation(records_path)
+    index = None if rebuild else load_feed_index(index_path)
+    fresh = (index is None or index.get('base_url') != base_url
+             or index.get('generation') != generation or not os.path.exists(rss_path))
+    if fresh:
+        index = {'base_url': base_url, 'generation': generation, 'newest_ms': cutoff_ms, 'items': []}
+
+    items = [item for item in index['items'] if item['epoch_ms'] >= cutoff_ms]
+    known = {item['guid'] for item in items}
+
+    # The newest item's own timestamp is re-read in case a poem shares it
+    new_items = []
+    for poem in poems_since(max(index['newest_ms'], cutoff_ms)):
+        guid = item_guid(poem)
+        if guid not in known:
+            new_items.append({'epoch_ms': poem.epoch_ms, 'guid': guid,
+                              'xml': render_item(poem, base_url)})
+
+    if not fresh and not new_items and len(items) == len(index['items']):
+        return len(items), 0
+
+    # Even with every item aged out, the (empty) channel is written
+    items = sorted(new_items + items, key=lambda item: item['epoch_ms'], reverse=True)
+    if not items:
+        print("No poems in the last 30 days; the feed is empty.")
 
-    if not poems:
-        print("No poems found. Run the haiku generator first.")
-        return
-
-    # Generate RSS feed (same format as Node.js)
-    rss_content = generate_rss_xml(poems)
-
-    # Save to parent directory (same level as scripts/)
-    rss_path = os.path.join(os.path.dirname(__file__), '..', 'rss.xml')
     with open(rss_path, 'w', encoding='utf-8') as f:
-        f.write(rss_content)
+        f.write(rss_document([item['xml'] for item in items], base_url))
+    precompress.precompress(rss_path)
 
-    # Filter for recent poems count
-    from datetime import timezone
-    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    recent_count = len([
-        poem for poem in poems
-        if datetime.fromisoformat(poem['date'].replace('Z', '+00:00')) >= thirty_days_ago
-    ])
+    index['items'] = items
+    if items:
+        index['newest_ms'] = max(index['newest_ms'], items[0]['epoch_ms'])
+    save_feed_index(index, index_path)
+    return len(items), len(new_items)
 
-    print(f"Generated rss.xml with {recent_count} recent poems (last 30 days)")
+def main():
+    """Generate rss.xml (incrementally; --full rebuilds it from the archive)"""
+    items, rendered = update_feed(rebuild='--full' in sys.argv[1:])
+    if items:
+        print(f"Updated rss.xml: {rendered} new item(s), {items} in the feed (last 30 days)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,6 +3,11 @@
 
 echo "Starting weekly git history squash..."
 
+# The hourly run no longer rewrites the full poems.json export; refresh it
+# here so the squashed commit carries an up-to-date copy
+echo "Exporting poems.json..."
+(cd "$(dirname "$0")" && python3 update_archive.py --export-json)
+
 # Get current branch
 CURRENT_BRANCH=$(git branch --show-current)
 